@@ -0,0 +1,217 @@
+import ast
+import csv
+import io
+import sqlite3
+import threading
+
+# --- 활동 기록 저장소 ---
+# 학생별 "기록" 문자열을 매번 파싱/재작성하는 대신, 한 줄씩 추가만 하는 SQLite 테이블에 저장한다.
+# 초기화는 기록을 지우지 않고 학생별 시작 위치(cutoff)만 옮긴다.
+# 추가한 기록은 on_append로 넘겨 시트의 사본(LogMirror)에도 남기고, DB가 없으면 사본에서 복원한다.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    class TEXT NOT NULL,
+    student TEXT NOT NULL,
+    activity TEXT NOT NULL,
+    reward TEXT,
+    info TEXT
+);
+CREATE INDEX IF NOT EXISTS logs_student ON logs (class, student, id);
+CREATE INDEX IF NOT EXISTS logs_activity ON logs (activity, id);
+CREATE TABLE IF NOT EXISTS cutoffs (
+    class TEXT NOT NULL,
+    student TEXT NOT NULL,
+    log_id INTEGER NOT NULL,
+    PRIMARY KEY (class, student)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+VISIBLE = "l.id >= COALESCE((SELECT log_id FROM cutoffs c WHERE c.class = l.class AND c.student = l.student), 0)"
+
+
+def to_text(value):
+    return None if value is None else str(value)
+
+
+class ActivityLog:
+    def __init__(self, path="activity_log.db", on_append=None):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        # [(id, timestamp, 반, 학생, activity, reward, info, 초기화 여부)] -> 기록을 추가한 뒤 호출
+        self.on_append = on_append
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+
+    def _insert(self, rows, reset=False):
+        # rows: (timestamp, 반, 학생, activity, reward, info) 튜플 목록 -> 추가한 기록 id 목록
+        rows = [(t, c, s, a, to_text(r), to_text(i)) for t, c, s, a, r, i in rows]
+        ids = []
+        with self.lock, self.conn:
+            for row in rows:
+                log_id = self.conn.execute(
+                    "INSERT INTO logs (timestamp, class, student, activity, reward, info) VALUES (?, ?, ?, ?, ?, ?)", row
+                ).lastrowid
+                ids.append(log_id)
+                if reset:
+                    # 초기화 기록부터 다시 보이도록 cutoff 이동 (기록 자체는 지우지 않음)
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO cutoffs (class, student, log_id) VALUES (?, ?, ?)", (row[1], row[2], log_id)
+                    )
+        if self.on_append is not None and rows:
+            self.on_append([(log_id, *row, reset) for log_id, row in zip(ids, rows)])
+        return ids
+
+    def append(self, timestamp, class_name, student, activity, reward=None, info=None):
+        return self._insert([(timestamp, class_name, student, activity, reward, info)])[0]
+
+    def append_many(self, rows):
+        self._insert(rows)
+
+    def reset(self, timestamp, class_name, student, activity, info=None):
+        self.reset_many([(timestamp, class_name, student, activity, None, info)])
+
+    def reset_many(self, rows):
+        self._insert(rows, reset=True)
+
+    # --- 로그 조회 (필터 + 페이지 단위) ---
+    def _where(self, class_name, student, activities=None, start=None, end=None):
+        clauses = ["class = ?", "student = ?", VISIBLE]
+        params = [class_name, student]
+        if activities:
+            clauses.append(f"activity IN ({', '.join('?' * len(activities))})")
+            params.extend(activities)
+        if start:
+            clauses.append("timestamp >= ?")
+            params.append(str(start))
+        if end:
+            clauses.append("timestamp <= ?")
+            params.append(f"{end} 23:59:59")
+        return " AND ".join(clauses), params
+
+    def count(self, class_name, student, activities=None, start=None, end=None):
+        where, params = self._where(class_name, student, activities, start, end)
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM logs l WHERE {where}", params).fetchone()[0]
+
+    def page(self, class_name, student, activities=None, start=None, end=None, limit=20, offset=0):
+        where, params = self._where(class_name, student, activities, start, end)
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT timestamp, activity, reward, info FROM logs l WHERE {where} ORDER BY id LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def activity_types(self, class_name, student):
+        where, params = self._where(class_name, student)
+        with self.lock:
+            rows = self.conn.execute(f"SELECT DISTINCT activity FROM logs l WHERE {where} ORDER BY activity", params).fetchall()
+        return [r[0] for r in rows]
+
+    def export_csv(self, class_name, student, activities=None, start=None, end=None, chunk_size=1000):
+        # 전체 기록을 리스트로 만들지 않고 커서에서 조금씩 읽어 CSV로 씀
+        where, params = self._where(class_name, student, activities, start, end)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["시간", "활동", "보상", "내용"])
+        with self.lock:
+            cursor = self.conn.execute(f"SELECT timestamp, activity, reward, info FROM logs l WHERE {where} ORDER BY id", params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                writer.writerows(tuple(r) for r in rows)
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        return buffer.getvalue().encode("utf-8-sig")
+
+    def by_activity(self, activity, after_id=0):
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT id, timestamp, class, student, reward, info FROM logs l "
+                f"WHERE activity = ? AND id > ? AND {VISIBLE} ORDER BY id",
+                (activity, after_id),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    # --- 기존 "기록" 컬럼에서 한 번만 옮겨오기 ---
+    def migrated(self):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'migrated'").fetchone()
+        return row is not None
+
+    def migrate_from_records(self, data):
+        rows = []
+        failed = []
+        for _, student_row in data.iterrows():
+            try:
+                records = ast.literal_eval(student_row["기록"]) if student_row["기록"] else []
+            except (ValueError, SyntaxError):
+                failed.append((student_row["반"], student_row["학생"]))
+                continue
+            for record in records:
+                rows.append((
+                    record.get("timestamp", ""),
+                    student_row["반"],
+                    student_row["학생"],
+                    record.get("activity", ""),
+                    record.get("reward"),
+                    record.get("additional_info"),
+                ))
+        rows = [(t, c, s, a, to_text(r), to_text(i)) for t, c, s, a, r, i in rows]
+        # 여러 프로세스가 동시에 시작해도 한 번만 옮겨지도록 확인과 추가를 한 트랜잭션에서 처리
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone():
+                return 0, failed
+            self.conn.executemany(
+                "INSERT INTO logs (timestamp, class, student, activity, reward, info) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('migrated', ?)", (str(len(rows)),))
+        return len(rows), failed
+
+    # --- 시트 사본과 주고받기 ---
+    def mirrored(self):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'mirrored'").fetchone()
+        return row is not None
+
+    def mark_mirrored(self):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('mirrored', '1')")
+
+    def entries(self):
+        # 사본 시트에 올릴 전체 기록 (on_append와 같은 형태, 초기화 여부는 현재 cutoff인 기록만)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT l.id, l.timestamp, l.class, l.student, l.activity, l.reward, l.info, c.log_id IS NOT NULL "
+                "FROM logs l LEFT JOIN cutoffs c ON c.log_id = l.id ORDER BY l.id"
+            ).fetchall()
+        return [(*r[:7], bool(r[7])) for r in rows]
+
+    def restore(self, entries):
+        # 로컬 DB를 잃은 경우 사본 시트의 기록으로 되살림 (id와 초기화 위치 유지)
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone():
+                return 0
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO logs (id, timestamp, class, student, activity, reward, info) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [entry[:7] for entry in entries],
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO cutoffs (class, student, log_id) VALUES (?, ?, ?)",
+                [(entry[2], entry[3], entry[0]) for entry in entries if entry[7]],
+            )
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('migrated', ?)", (f"restored {len(entries)}",))
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('mirrored', '1')")
+        return len(entries)
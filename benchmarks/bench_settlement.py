@@ -0,0 +1,110 @@
+"""로또 정산 벤치마크: 기존 파이썬 루프 vs 비트마스크 벡터 정산.
+
+기존 루프는 당첨마다 학생의 기록 문자열을 파싱/재작성했으므로 그 비용도 함께 잰다.
+
+    python benchmarks/bench_settlement.py --tickets 10000 --history 20
+"""
+import ast
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lotto_draw import settle_tickets  # noqa: E402
+
+
+def make_tickets(n, students, seed=0):
+    # student_index는 기존 루프용, 새 정산은 (반, 학생)으로 묶음
+    rng = random.Random(seed)
+    indexes = [rng.randrange(students) for _ in range(n)]
+    return [
+        {"student_index": i, "반": "1반", "학생": f"학생{i}", "chosen_numbers": rng.sample(range(1, 21), 3)}
+        for i in indexes
+    ]
+
+
+def make_histories(students, history):
+    record = {"timestamp": "2025-01-01 10:00:00", "activity": "세진코인 변경", "reward": None, "additional_info": "변경된 코인: 1"}
+    return {i: str([record] * history) for i in range(students)}
+
+
+def legacy_settle(tickets, main_balls, bonus_ball, histories):
+    # main.py의 기존 추첨 루프 (add_record는 기록 문자열 파싱/재작성으로 재현)
+    histories = dict(histories)
+    credits = {}
+    winners = []
+    for ticket in tickets:
+        ticket_numbers = ticket["chosen_numbers"]
+        match_count = len(set(ticket_numbers) & set(main_balls))
+        reward = None
+        if match_count == 3:
+            reward = "치킨"
+        elif match_count == 2:
+            remaining_number = list(set(ticket_numbers) - set(main_balls))[0]
+            if bonus_ball is not None and remaining_number == bonus_ball:
+                reward = "햄버거세트"
+            else:
+                reward = "매점이용권"
+        elif match_count == 1:
+            reward = "0.5코인"
+            credits[ticket["student_index"]] = credits.get(ticket["student_index"], 0) + 0.5
+        if reward:
+            record_list = ast.literal_eval(histories[ticket["student_index"]])
+            record_list.append({"timestamp": "", "activity": "로또 당첨", "reward": reward,
+                                "additional_info": f"당첨 번호: {main_balls}, 선택 번호: {ticket_numbers}"})
+            histories[ticket["student_index"]] = str(record_list)
+            winners.append({
+                "학생": ticket["학생"],
+                "당첨 보상": reward,
+                "선택 번호": ticket_numbers,
+                "당첨 번호": main_balls
+            })
+    return winners, credits
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--history", type=int, default=20, help="학생별 기존 기록 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tickets = make_tickets(args.tickets, args.students)
+    histories = make_histories(args.students, args.history)
+    main_balls, bonus_ball = [3, 7, 15], 11
+
+    def vector_settle():
+        # bulk_ops.apply_settlements처럼 기록은 한 번에 모아서 추가할 행만 만든다
+        settlement = settle_tickets(tickets, main_balls, bonus_ball)
+        rows = [(w["반"], w["학생"], "로또 당첨", w["당첨 보상"], f"당첨 번호: {main_balls}, 선택 번호: {w['선택 번호']}")
+                for w in settlement["winners"]]
+        return settlement, rows
+
+    legacy_time, (legacy_winners, legacy_credits) = best_of(
+        lambda: legacy_settle(tickets, main_balls, bonus_ball, histories), args.repeat)
+    vector_time, (settlement, _) = best_of(vector_settle, args.repeat)
+
+    assert [w["당첨 보상"] for w in settlement["winners"]] == [w["당첨 보상"] for w in legacy_winners]
+    assert settlement["credits"] == {("1반", f"학생{i}"): coins for i, coins in legacy_credits.items()}
+
+    print(f"tickets: {args.tickets}, students: {args.students}, history: {args.history}")
+    print(f"legacy loop: {legacy_time * 1000:.2f} ms")
+    print(f"vectorized:  {vector_time * 1000:.2f} ms")
+    print(f"speedup:     {legacy_time / vector_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
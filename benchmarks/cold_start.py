@@ -0,0 +1,169 @@
+"""앱 첫 화면까지 걸리는 시간(콜드 스타트)과 재실행 시간을 모드별로 잰다.
+
+모드마다 새 파이썬 프로세스에서 streamlit AppTest로 main.py를 실행한다. 시트는 가짜 워크시트로 바꾸고
+gspread / google-auth 모듈이 실제로 import 되었는지도 함께 기록한다.
+
+    python benchmarks/cold_start.py --output cold.json
+    python benchmarks/cold_start.py --runs 3 --students 1000
+    python benchmarks/cold_start.py --fresh   # 로컬 DB/스냅샷도 없는 첫 배포 상태에서 측정
+
+기본값은 앱을 한 번 실행해 둔 작업 폴더(활동 기록 이전, 잔액 저장소, 스냅샷이 있는 상태)를 복사해
+재시작 직후를 재현한다.
+"""
+import argparse
+import importlib.abc
+import importlib.util
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ["학생용", "교사용", "통계용", "로그 확인"]
+HEAVY_MODULES = ["gspread", "google.oauth2.service_account", "googleapiclient"]
+
+
+class PatchOnImport(importlib.abc.MetaPathFinder):
+    # 모듈이 처음 import 될 때 patch를 적용 (미리 import 하면 import 비용을 잴 수 없으므로)
+    def __init__(self, patches):
+        self.patches = patches
+
+    def find_spec(self, name, path, target=None):
+        if name not in self.patches:
+            return None
+        sys.meta_path.remove(self)
+        try:
+            spec = importlib.util.find_spec(name)
+        finally:
+            sys.meta_path.insert(0, self)
+        exec_module = spec.loader.exec_module
+        patch = self.patches[name]
+
+        def patched(module):
+            exec_module(module)
+            patch(module)
+        spec.loader.exec_module = patched
+        return spec
+
+
+def child(mode, students, workdir, reruns=5):
+    # 새 프로세스에서 한 모드의 첫 실행과 재실행 시간을 잰다
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    sys.path.insert(0, ROOT)
+    from fake_sheet import FakeWorksheet
+    framework_seconds = time.perf_counter() - start
+
+    records = [
+        {"반": f"{i // 30 + 1}반", "학생": f"학생{i}", "세진코인": 5, "기록": "[]", "비밀번호": "1234"}
+        for i in range(students)
+    ]
+    sheet = FakeWorksheet.from_records(records)
+
+    class FakeClient:
+        def open_by_url(self, url):
+            return type("Spreadsheet", (), {"sheet1": sheet})()
+
+    def patch_gspread(module):
+        module.authorize = lambda creds: FakeClient()
+
+    def patch_google(module):
+        module.Credentials.from_service_account_info = staticmethod(lambda *args, **kwargs: None)
+
+    sys.meta_path.insert(0, PatchOnImport({"gspread": patch_gspread, "google.oauth2.service_account": patch_google}))
+    os.chdir(workdir)
+    with open("bgm.mp3", "wb") as f:
+        f.write(b"\0" * 16)
+
+    at = AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout=120)
+    at.secrets["general"] = {"spreadsheet": "fake", "admin_password": "admin"}
+    at.secrets["Drive"] = {}
+    at.session_state["mode"] = mode  # 모드 선택 라디오의 key
+    start = time.perf_counter()
+    at.run()
+    first_render = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    imported = [name for name in HEAVY_MODULES if name in sys.modules]
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    rerun = statistics.median(times)
+    return {
+        "framework_ms": round(framework_seconds * 1000, 1),
+        "first_render_ms": round(first_render * 1000, 1),
+        "rerun_ms": round(rerun * 1000, 1),
+        "heavy_imports": imported,
+    }
+
+
+def run_child(mode, students, workdir):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, "--students", str(students), "--workdir", workdir],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_mode(mode, students, prepared=None):
+    # prepared가 있으면 그 작업 폴더를 복사해서, 없으면 빈 폴더에서 실행
+    with tempfile.TemporaryDirectory() as workdir:
+        if prepared is not None:
+            workdir = shutil.copytree(prepared, os.path.join(workdir, "app"))
+        return run_child(mode, students, workdir)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=3, help="모드별 새 프로세스 실행 횟수")
+    parser.add_argument("--modes", nargs="+", default=MODES)
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--fresh", action="store_true", help="로컬 DB/스냅샷 없이 첫 배포 상태에서 측정")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.students, args.workdir), ensure_ascii=False))
+        return
+
+    report = {"commit": git_commit(), "students": args.students, "fresh": args.fresh, "results": {}}
+    prepared = None
+    if not args.fresh:
+        prepared = tempfile.mkdtemp()
+        run_child(MODES[0], args.students, prepared)
+    for mode in args.modes:
+        runs = [run_mode(mode, args.students, prepared) for _ in range(args.runs)]
+        summary = {
+            key: round(statistics.median(r[key] for r in runs), 1)
+            for key in ("framework_ms", "first_render_ms", "rerun_ms")
+        }
+        summary["heavy_imports"] = runs[-1]["heavy_imports"]
+        report["results"][mode] = summary
+        print(
+            f"{mode:<6} first render {summary['first_render_ms']:>8.1f} ms  rerun {summary['rerun_ms']:>7.1f} ms  "
+            f"(streamlit import {summary['framework_ms']:.1f} ms)  heavy imports: {', '.join(summary['heavy_imports']) or '-'}"
+        )
+    if prepared is not None:
+        shutil.rmtree(prepared, ignore_errors=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import json
+
+from sheet_sync import to_cell_value
+
+# --- 테스트/벤치마크용 가짜 워크시트 ---
+# gspread 워크시트/스프레드시트 대신 메모리에서 동작하고, 메서드별 호출 수와 보낸 바이트 수를 센다.
+
+
+class FakeWorksheet:
+    def __init__(self, header, rows=None, title="Sheet1", parent=None):
+        self.header = list(header)
+        self.rows = [list(r) for r in rows or []]
+        self.title = title
+        self.parent = parent  # add_worksheet로 만든 워크시트의 스프레드시트 (첫 워크시트가 스프레드시트 역할)
+        self.added = []
+        self.calls = {}
+        self.bytes_sent = 0
+        self.modified = 0  # 쓰기마다 증가 (Drive 수정 시각 대용, 스프레드시트 전체에 하나)
+
+    @classmethod
+    def from_records(cls, records):
+        header = list(records[0].keys()) if records else []
+        return cls(header, [[r.get(h, "") for h in header] for r in records])
+
+    def _count(self, name, payload=None):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if payload is not None:
+            self.bytes_sent += len(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"))
+
+    def reset_stats(self):
+        self.calls = {}
+        self.bytes_sent = 0
+
+    @property
+    def spreadsheet(self):
+        return self.parent or self
+
+    def _touch(self):
+        self.spreadsheet.modified += 1
+
+    def worksheets(self):
+        return [self] + self.added
+
+    def add_worksheet(self, title, rows=1000, cols=26):
+        worksheet = FakeWorksheet([], title=title, parent=self)
+        self.added.append(worksheet)
+        return worksheet
+
+    def get_lastUpdateTime(self):
+        self._count("get_lastUpdateTime")
+        return str(self.modified)
+
+    def get_all_records(self):
+        self._count("get_all_records")
+        return [dict(zip(self.header, row)) for row in self.rows]
+
+    def update(self, values, range_name=None):
+        self._count("update", values)
+        values = [[to_cell_value(v) for v in row] for row in values]
+        self.header, self.rows = values[0], values[1:]
+        self._touch()
+
+    def batch_update(self, data):
+        self._count("batch_update", data)
+        for item in data:
+            self._write_range(item["range"], item["values"])
+        self._touch()
+
+    def append_rows(self, values, value_input_option=None):
+        # 첫 줄은 머리글
+        self._count("append_rows", values)
+        values = [[to_cell_value(v) for v in row] for row in values]
+        if not self.header:
+            self.header, values = values[0], values[1:]
+        self.rows.extend(values)
+        self._touch()
+
+    def get_all_values(self):
+        self._count("get_all_values")
+        return [list(self.header)] + [[str(v) for v in row] for row in self.rows]
+
+    def _write_range(self, range_name, values):
+        start = range_name.split(":")[0]
+        letters = start.rstrip("0123456789")
+        row = int(start[len(letters):])
+        col = 0
+        for ch in letters:
+            col = col * 26 + ord(ch) - 64
+        for r_offset, row_values in enumerate(values):
+            target = self.rows[row - 2 + r_offset]
+            for c_offset, value in enumerate(row_values):
+                target[col - 1 + c_offset] = value
@@ -0,0 +1,315 @@
+"""오프라인 성능 벤치마크.
+
+가짜 워크시트(FakeWorksheet)와 students_points.csv 형태의 가상 명단(반, 학생, 세진코인, 기록, 비밀번호)으로
+앱이 실제로 쓰는 코드 경로(로드, 코인 변경, 학급 일괄 변경, 티켓 구매, 추첨 정산, 통계, 로그 조회)를 잰다.
+결과를 JSON으로 저장해 두고 다음 커밋에서 --compare로 비교하면 느려진 항목을 찾을 수 있다.
+
+    python benchmarks/run.py --students 1000 10000 --output bench.json
+    python benchmarks/run.py --students 1000 10000 --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from activity_log import ActivityLog  # noqa: E402
+from bulk_ops import apply_coin_change, apply_settlements, sheet_balances, write_balances  # noqa: E402
+from coin_store import CoinStore  # noqa: E402
+from data_cache import DataCache, frame_from_records  # noqa: E402
+from fake_sheet import FakeWorksheet  # noqa: E402
+from lotto_draw import draw_classes, settle_tickets  # noqa: E402
+from lotto_engine import DEFAULT_CONFIG  # noqa: E402
+from lotto_stats import LottoStats  # noqa: E402
+from sheet_sync import ChangeTracker, SheetPool, WriteBehind, save_changes  # noqa: E402
+from student_index import StudentIndex  # noqa: E402
+
+CLASS_SIZE = 30
+ACTIVITIES = ["세진코인 변경", "로또 티켓 구매", "로또 당첨", "학급 전체 세진코인 변경"]
+REWARDS = ["치킨", "햄버거세트", "매점이용권", "0.5코인"]
+
+
+def make_roster(students, history, seed=0):
+    rng = random.Random(seed)
+    records = []
+    for i in range(students):
+        log = []
+        for k in range(history):
+            activity = rng.choice(ACTIVITIES)
+            log.append({
+                "timestamp": f"2025-{1 + k % 12:02d}-{1 + k % 28:02d} 10:00:00",
+                "activity": activity,
+                "reward": rng.choice(REWARDS) if activity == "로또 당첨" else None,
+                "additional_info": "변경된 코인: 1",
+            })
+        records.append({
+            "반": f"{i // CLASS_SIZE + 1}반",
+            "학생": f"학생{i}",
+            "세진코인": rng.randint(0, 50),
+            "기록": str(log),
+            "비밀번호": "1234",
+        })
+    return records
+
+
+class Env:
+    def __init__(self, students, history, workdir):
+        self.sheet = FakeWorksheet.from_records(make_roster(students, history))
+        self.cache = DataCache(
+            lambda: frame_from_records(self.sheet.get_all_records()),
+            self.sheet.get_lastUpdateTime,
+            os.path.join(workdir, "data_cache.pkl"),
+            ttl=3600,
+        )
+        self.data = self.cache.get()
+        self.students = StudentIndex(self.data)
+        self.log = ActivityLog(os.path.join(workdir, "activity_log.db"))
+        start = time.perf_counter()
+        self.log.migrate_from_records(self.data)
+        self.migrate_seconds = time.perf_counter() - start
+        self.coins = CoinStore(os.path.join(workdir, "coin_store.db"))
+        self.coins.set_balances(sheet_balances(self.data))
+        # 앱과 같이 연결 풀을 거쳐 시트에 쓴다
+        self.pool = SheetPool(lambda: self.sheet)
+        self.writer = WriteBehind(
+            self.pool, os.path.join(workdir, "sheet_journal.jsonl"),
+            revision=self.sheet.get_lastUpdateTime, on_flush=self.cache.note_flushed, frame=self.cache.frame_at,
+        )
+        self.tracker = ChangeTracker()
+        self.workdir = workdir
+        self.counter = 0
+
+    def save(self):
+        # main.save_data와 같은 경로 (시트 전송과 스냅샷 저장은 백그라운드에서 하므로 measure의 after에서)
+        save_changes(self.data, self.tracker, self.writer, self.cache)
+
+    def student(self):
+        self.counter += 1
+        idx = self.counter * 7919 % len(self.data)
+        return idx, self.data.at[idx, "반"], self.data.at[idx, "학생"]
+
+    def write_balances(self, balances):
+        # main.change_coins와 같이 (반, 학생) 잔액을 해당 행에 반영
+        write_balances(self.data, self.tracker, balances, self.students.rows)
+
+
+def measure(fn, repeat, after=None):
+    # after: 반복마다 시간을 재지 않고 실행 (백그라운드 전송 등)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+        if after is not None:
+            after()
+    return {"best_ms": round(min(times) * 1000, 3), "median_ms": round(statistics.median(times) * 1000, 3)}
+
+
+def scenario_load(env):
+    return frame_from_records(env.sheet.get_all_records())
+
+
+def scenario_index(env):
+    return StudentIndex(env.data)
+
+
+def scenario_coin_change(env):
+    _, class_name, student = env.student()
+    env.write_balances(env.coins.adjust_balances({(class_name, student): 1}))
+    env.log.append("2025-06-01 10:00:00", class_name, student, "세진코인 변경", None, "변경된 코인: 1")
+    env.save()
+
+
+def scenario_class_batch(env):
+    _, class_name, _ = env.student()
+    apply_coin_change(
+        env.data, env.tracker, env.coins, env.log, env.students.class_rows(class_name),
+        "2025-06-01 10:00:00", "학급 전체 세진코인 변경", "일괄 변경된 코인: 1", delta=1,
+    )
+    env.save()
+
+
+def scenario_purchase(env):
+    idx, class_name, student = env.student()
+    numbers = random.Random(env.counter).sample(range(1, 21), 3)
+    env.coins.adjust_balances({(class_name, student): 1})
+    try:
+        coins = env.coins.purchase(class_name, student, numbers, "2025-06-01 10:00:00")
+    except Exception:
+        return
+    env.data.at[idx, "세진코인"] = coins
+    env.tracker.mark(idx, "세진코인")
+    env.log.append("2025-06-01 10:00:00", class_name, student, "로또 티켓 구매", None, f"선택 번호: {numbers}")
+    env.save()
+
+
+def seed_tickets(env, class_name, count):
+    rng = random.Random(1)
+    names = env.students.students(class_name)
+    env.coins.adjust_balances({(class_name, student): count for student in names})
+    bought = 0
+    while bought < count:
+        try:
+            env.coins.purchase(class_name, rng.choice(names), rng.sample(range(1, 21), 3), "")
+        except Exception:
+            continue
+        bought += 1
+
+
+def settle_draws(env, results):
+    # 앱과 같은 bulk_ops.apply_settlements로 회차 마감, 당첨금 지급, 당첨 기록 추가
+    # (티켓은 다음 반복에서도 쓰도록 지우지 않고 다음 회차로 넘김)
+    timestamp = "2025-06-01 10:00:00"
+    draws = [
+        {"round_id": env.coins.open_round(c, DEFAULT_CONFIG.to_json(), timestamp)["id"], "ticket_ids": [], **r}
+        for c, r in results.items()
+    ]
+    apply_settlements(env.data, env.tracker, env.coins, env.log, env.students.rows, draws, timestamp)
+
+
+def scenario_settlement(env, class_name):
+    tickets = env.coins.tickets(class_name)
+    settlement = settle_tickets(tickets, [3, 7, 15], 11)
+    settle_draws(env, {class_name: {"main_balls": [3, 7, 15], "bonus_ball": 11, "settlement": settlement}})
+    env.save()
+
+
+def scenario_draw_all(env, classes):
+    # 여러 반을 동시에 추첨하고 잔액/기록/시트 저장은 한 번씩
+    results, _ = draw_classes({c: (env.coins.tickets(c), DEFAULT_CONFIG) for c in classes})
+    settle_draws(env, results)
+    env.save()
+
+
+def scenario_stats_cold(env):
+    stats = LottoStats()
+    stats.refresh(env.log)
+    return stats.summary(), stats.class_breakdown()
+
+
+def scenario_log_page(env):
+    _, class_name, student = env.student()
+    total = env.log.count(class_name, student)
+    return env.log.page(class_name, student, limit=20, offset=max(total - 20, 0))
+
+
+def run_size(students, history, repeat, tickets):
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        env = Env(students, history, workdir)
+        setup_seconds = time.perf_counter() - start
+
+        results = {"setup_ms": round(setup_seconds * 1000, 1)}
+        results["load"] = measure(lambda: scenario_load(env), repeat)
+        results["load_cached"] = measure(env.cache.get, repeat)
+        results["student_index"] = measure(lambda: scenario_index(env), repeat)
+        # 기존 "기록" 컬럼 이전은 한 번만 일어나므로 준비 단계에서 잰 값을 그대로 기록
+        results["migrate_history"] = {"best_ms": round(env.migrate_seconds * 1000, 3), "median_ms": round(env.migrate_seconds * 1000, 3)}
+
+        env.sheet.reset_stats()
+        flush = env.writer.flush
+        results["coin_change"] = measure(lambda: scenario_coin_change(env), repeat, after=flush)
+        results["coin_change_bytes"] = env.sheet.bytes_sent // repeat
+        # 백그라운드 전송 한 번 (batch_update + 전후 수정 시각 확인 + 스냅샷 저장)
+        scenario_coin_change(env)
+        results["background_flush"] = measure(flush, repeat, after=lambda: scenario_coin_change(env))
+        flush()
+        results["class_batch"] = measure(lambda: scenario_class_batch(env), repeat, after=flush)
+        results["ticket_purchase"] = measure(lambda: scenario_purchase(env), repeat, after=flush)
+
+        draw_class = env.students.classes[0]
+        seed_tickets(env, draw_class, tickets)
+        results["draw_settlement"] = measure(lambda: scenario_settlement(env, draw_class), repeat, after=flush)
+        # 열두 반 (명단이 작으면 있는 반 전부) 동시 추첨
+        draw_classes_all = env.students.classes[1:13]
+        for class_name in draw_classes_all:
+            seed_tickets(env, class_name, tickets // 10)
+        env.sheet.reset_stats()
+        results["draw_all_classes"] = measure(lambda: scenario_draw_all(env, draw_classes_all), repeat, after=flush)
+        results["draw_all_sheet_writes"] = env.sheet.calls.get("batch_update", 0) // repeat
+
+        stats = LottoStats()
+        stats.refresh(env.log)
+        results["stats_cold"] = measure(lambda: scenario_stats_cold(env), repeat)
+        results["stats_warm"] = measure(lambda: (stats.refresh(env.log), stats.summary()), repeat)
+        results["log_page"] = measure(lambda: scenario_log_page(env), repeat)
+        pool = env.pool.stats()
+        results["sheet_connects"] = pool["connects"]
+        results["sheet_calls"] = pool["calls"]
+        results["sheet_retried"] = pool["retried"]
+        return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(current, previous, threshold, min_ms):
+    # best_ms 기준으로 threshold배 이상, min_ms 이상 느려진 항목을 표시 (아주 짧은 작업의 잡음 제외)
+    regressions = []
+    for size, results in current["results"].items():
+        before = previous["results"].get(size, {})
+        for name, value in results.items():
+            if not isinstance(value, dict) or name not in before:
+                continue
+            old, new = before[name]["best_ms"], value["best_ms"]
+            ratio = new / old if old else float("inf")
+            flag = "  SLOWER" if ratio > threshold and new - old > min_ms else ""
+            print(f"{size:>6} {name:<18} {old:>10.3f} -> {new:>10.3f} ms  x{ratio:.2f}{flag}")
+            if flag:
+                regressions.append((size, name))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--history", type=int, default=30, help="학생별 기록 수")
+    parser.add_argument("--tickets", type=int, default=2000, help="추첨 정산에 쓸 티켓 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--compare", help="이전 결과 JSON 파일과 비교")
+    parser.add_argument("--threshold", type=float, default=1.2, help="이 배수 이상 느려지면 SLOWER로 표시")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="이 시간(ms) 미만의 차이는 무시")
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "params": {"history": args.history, "tickets": args.tickets, "repeat": args.repeat},
+        "results": {},
+    }
+    for students in args.students:
+        results = run_size(students, args.history, args.repeat, args.tickets)
+        report["results"][str(students)] = results
+        print(f"== {students} students ==")
+        for name, value in results.items():
+            if isinstance(value, dict):
+                print(f"  {name:<18} best {value['best_ms']:>10.3f} ms  median {value['median_ms']:>10.3f} ms")
+            else:
+                print(f"  {name:<18} {value}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        print(f"== compare with {previous.get('commit')} ==")
+        if compare(report, previous, args.threshold, args.min_ms):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
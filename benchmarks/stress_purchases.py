@@ -0,0 +1,68 @@
+"""여러 프로세스가 동시에 로또 티켓을 살 때 잔액 차감/티켓이 사라지지 않는지 확인한다.
+
+    python benchmarks/stress_purchases.py --procs 8 --attempts 200
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coin_store import CoinStore, DuplicateTicket, InsufficientCoins  # noqa: E402
+
+
+def worker(path, seed, students, attempts):
+    store = CoinStore(path)
+    rng = random.Random(seed)
+    bought = 0
+    for _ in range(attempts):
+        student = f"학생{rng.randrange(students)}"
+        try:
+            store.purchase("1반", student, rng.sample(range(1, 21), 3), "")
+        except (DuplicateTicket, InsufficientCoins):
+            continue
+        bought += 1
+    return bought
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--procs", type=int, default=8)
+    parser.add_argument("--attempts", type=int, default=200, help="프로세스당 구매 시도 수")
+    parser.add_argument("--students", type=int, default=5)
+    parser.add_argument("--coins", type=int, default=100, help="학생별 시작 잔액")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "coin_store.db")
+    CoinStore(path).set_balances({("1반", f"학생{i}"): args.coins for i in range(args.students)})
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.procs) as pool:
+        bought = pool.starmap(worker, [(path, seed, args.students, args.attempts) for seed in range(args.procs)])
+    elapsed = time.perf_counter() - start
+
+    store = CoinStore(path)
+    tickets = store.tickets("1반")
+    balances = store.balances()
+    per_student = {("1반", f"학생{i}"): 0 for i in range(args.students)}
+    for ticket in tickets:
+        per_student[(ticket["반"], ticket["학생"])] += 1
+
+    assert sum(bought) == len(tickets), (sum(bought), len(tickets))
+    for student, count in per_student.items():
+        assert balances[student] == args.coins - count, (student, balances[student], count)
+        assert balances[student] >= 0
+    keys = {(t["학생"], tuple(t["chosen_numbers"])) for t in tickets}
+    assert len(keys) == len(tickets)
+
+    print(f"processes: {args.procs}, attempts: {args.procs * args.attempts}, purchases: {len(tickets)}")
+    print(f"elapsed: {elapsed:.2f} s ({len(tickets) / elapsed:.0f} purchases/s)")
+    print("no lost updates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import pandas as pd
+
+from student_index import first_rows
+
+# --- 학급 단위 일괄 코인 작업 ---
+# 여러 학생의 코인 변경/초기화와 로또 정산을 잔액 저장소 트랜잭션 한 번, 컬럼 일괄 갱신 한 번,
+# 기록 일괄 추가 한 번으로 처리한다. 되돌리기를 위해 변경 전 잔액을 남긴다.
+# 앱(main.py)과 벤치마크가 같은 함수를 쓴다.
+
+
+def select_rows(students, classes, names=None):
+    # classes: 반 목록, names: 특정 학생만 고를 때 (반, 학생) 목록
+    if names:
+        return [students.locate(class_name, student) for class_name, student in names if class_name in classes]
+    return [idx for class_name in classes for idx in students.class_rows(class_name)]
+
+
+def preview_coin_change(data, rows, delta=0, reset=False):
+    before = data.loc[rows, "세진코인"]
+    after = pd.Series(0.0, index=before.index) if reset else before + delta
+    return pd.DataFrame({
+        "반": data.loc[rows, "반"],
+        "학생": data.loc[rows, "학생"],
+        "현재 코인": before,
+        "변경 후 코인": after,
+    })
+
+
+def sheet_balances(data):
+    # {(반, 학생): 시트 잔액} - 같은 반에 같은 이름이 있으면 색인(StudentIndex)과 같이 첫 번째 행 (뒤에서부터 넣어 첫 행이 남음)
+    keys = list(zip(data["반"], data["학생"]))
+    return dict(zip(reversed(keys), reversed(data["세진코인"].tolist())))
+
+
+def write_balances(data, tracker, balances, positions):
+    # 잔액 저장소는 {(반, 학생): 잔액}으로 돌려주므로 positions((반, 학생) -> 행)로 행을 찾아 반영
+    found = [(positions[key], coins) for key, coins in balances.items() if key in positions]
+    data.loc[[idx for idx, _ in found], "세진코인"] = [coins for _, coins in found]
+    for idx, _ in found:
+        tracker.mark(idx, "세진코인")
+
+
+def apply_coin_change(data, tracker, coin_store, activity_log, rows, timestamp, activity, info, delta=0, reset=False):
+    keys = list(zip(data.loc[rows, "반"].tolist(), data.loc[rows, "학생"].tolist()))
+    before = dict(zip(keys, data.loc[rows, "세진코인"].tolist()))
+    if reset:
+        balances = coin_store.set_balances({key: 0 for key in keys})
+    else:
+        balances = coin_store.adjust_balances({key: delta for key in keys})
+    write_balances(data, tracker, balances, dict(zip(keys, rows)))
+    log_rows = [(timestamp, class_name, student, activity, None, info) for class_name, student in keys]
+    if reset:
+        activity_log.reset_many(log_rows)
+    else:
+        activity_log.append_many(log_rows)
+    return {"keys": keys, "before": before, "delta": delta, "reset": reset, "activity": activity}
+
+
+def undo_coin_change(data, tracker, coin_store, activity_log, plan, timestamp):
+    # 증감은 반대로 다시 적용(그 사이 티켓 구매 등은 유지), 초기화는 이전 잔액으로 복원
+    # 초기화로 숨겨진 기록은 되돌리지 않는다
+    if plan["reset"]:
+        balances = coin_store.set_balances(plan["before"])
+    else:
+        balances = coin_store.adjust_balances({key: -plan["delta"] for key in plan["keys"]})
+    # 되돌리기 전에 시트가 다시 로드돼 행 순서가 바뀌었을 수 있으므로 행을 다시 찾음
+    write_balances(data, tracker, balances, first_rows(data))
+    activity_log.append_many([
+        (timestamp, class_name, student, "일괄 작업 취소", None, f"취소한 작업: {plan['activity']}")
+        for class_name, student in plan["keys"]
+    ])
+
+
+def apply_settlements(data, tracker, coin_store, activity_log, positions, draws, timestamp):
+    # 로또 정산 결과를 한 번에 반영 (회차 마감 + 학생별 코인 지급은 한 트랜잭션, 그다음 당첨 기록)
+    # draws: [{"round_id", "main_balls", "bonus_ball", "ticket_ids", "settlement"}] - 여러 반을 추첨해도 반영은 한 번씩
+    # 다른 세션이 먼저 추첨한 회차는 건너뛰고, 실제로 정산한 draws만 돌려줌
+    settled, balances = coin_store.settle_rounds(
+        [{**d, "credits": d["settlement"]["credits"]} for d in draws], timestamp)
+    write_balances(data, tracker, balances, positions)
+    draws = [d for d in draws if d["round_id"] in settled]
+    activity_log.append_many([
+        (timestamp, w["반"], w["학생"], "로또 당첨", w["당첨 보상"],
+         f"회차: {d['round_id']}, 당첨 번호: {d['main_balls']}, 선택 번호: {w['선택 번호']}")
+        for d in draws
+        for w in d["settlement"]["winners"]
+    ])
+    return draws
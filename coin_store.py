@@ -0,0 +1,299 @@
+import json
+import os
+import pickle
+import sqlite3
+import threading
+
+# --- 코인 잔액 / 로또 티켓 저장소 ---
+# 여러 세션(프로세스)이 동시에 티켓을 사도 잔액 차감이나 티켓이 사라지지 않도록
+# SQLite(WAL) 트랜잭션 안에서 "티켓 가격 차감 + 티켓 추가"를 한 번에 처리한다.
+# 티켓은 반별 회차(rounds)에 속하고, 회차에는 그 회차의 로또 설정과 추첨 결과가 남는다.
+# 잔액과 티켓은 활동 기록처럼 (반, 학생)으로 저장해 시트의 행을 끼워 넣거나 정렬해도 학생이 바뀌지 않는다.
+# 잔액을 바꿀 때마다 트랜잭션별로 늘어나는 변경 번호(seq)를 남겨, 화면에는 바뀐 잔액만 다시 반영한다.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wallets (
+    class TEXT NOT NULL,
+    student TEXT NOT NULL,
+    coins REAL NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (class, student)
+);
+CREATE INDEX IF NOT EXISTS wallets_seq ON wallets (seq);
+CREATE TABLE IF NOT EXISTS tickets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    class TEXT NOT NULL,
+    student TEXT NOT NULL,
+    numbers TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    round_id INTEGER,
+    UNIQUE (class, student, numbers)
+);
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    class TEXT NOT NULL,
+    config TEXT NOT NULL,
+    opened_at TEXT NOT NULL,
+    drawn_at TEXT,
+    main_balls TEXT,
+    bonus_ball INTEGER,
+    tickets INTEGER
+);
+CREATE INDEX IF NOT EXISTS rounds_open ON rounds (class, drawn_at);
+"""
+
+
+class DuplicateTicket(Exception):
+    pass
+
+
+class InsufficientCoins(Exception):
+    pass
+
+
+class MissingWallet(Exception):
+    # 잔액 저장소에 없는 학생의 잔액을 증감하려 한 경우 (증감만으로는 잔액을 알 수 없음)
+    pass
+
+
+def numbers_key(numbers):
+    return ",".join(str(n) for n in sorted(int(n) for n in numbers))
+
+
+def _next_seq(conn):
+    # 쓰기 트랜잭션(BEGIN IMMEDIATE) 안에서 호출하므로 커밋 순서대로 증가
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM wallets").fetchone()[0]
+
+
+def _adjust(conn, deltas):
+    # 잔액이 없는 학생이 있으면 MissingWallet (트랜잭션 전체를 되돌림)
+    seq = _next_seq(conn)
+    conn.executemany(
+        "UPDATE wallets SET coins = coins + ?, seq = ? WHERE class = ? AND student = ?",
+        [(float(delta), seq, class_name, student) for (class_name, student), delta in deltas.items()],
+    )
+    found = conn.execute(
+        "SELECT class, student, coins FROM wallets WHERE (class, student) IN "
+        "(SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]') FROM json_each(?))",
+        (json.dumps([list(key) for key in deltas], ensure_ascii=False),),
+    ).fetchall()
+    balances = {(class_name, student): coins for class_name, student, coins in found}
+    missing = [key for key in deltas if key not in balances]
+    if missing:
+        raise MissingWallet(missing)
+    return balances
+
+
+class CoinStore:
+    def __init__(self, path="coin_store.db", timeout=30):
+        # isolation_level=None: 트랜잭션은 BEGIN IMMEDIATE로 직접 시작
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+
+    def _transaction(self, work):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self.conn)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return result
+
+    # --- 잔액 ---
+    # 잔액은 {(반, 학생): 코인} 형태로 주고받는다
+    def balances(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT class, student, coins FROM wallets").fetchall()
+        return {(class_name, student): coins for class_name, student, coins in rows}
+
+    def changes_since(self, seq):
+        # 변경 번호 seq 이후에 바뀐 잔액 -> (마지막 변경 번호, {(반, 학생): 잔액})
+        with self.lock:
+            rows = self.conn.execute("SELECT class, student, coins, seq FROM wallets WHERE seq > ?", (seq,)).fetchall()
+        return max([seq] + [row[3] for row in rows]), {(class_name, student): coins for class_name, student, coins, _ in rows}
+
+    def adjust_balances(self, deltas):
+        # {(반, 학생): 증감} -> {(반, 학생): 변경 후 잔액}
+        return self._transaction(lambda conn: _adjust(conn, deltas))
+
+    def seed_balances(self, values):
+        # 저장소에 아직 없는 학생만 values의 잔액으로 추가 (있는 잔액은 그대로)
+        def work(conn):
+            seq = _next_seq(conn)
+            conn.executemany(
+                "INSERT OR IGNORE INTO wallets (class, student, coins, seq) VALUES (?, ?, ?, ?)",
+                [(class_name, student, float(coins), seq) for (class_name, student), coins in values.items()],
+            )
+        self._transaction(work)
+
+    def set_balances(self, values):
+        # 프로세스 시작 시 시트 잔액으로 맞출 때와 시트가 외부에서 수정됐을 때도 사용
+        def work(conn):
+            seq = _next_seq(conn)
+            conn.executemany(
+                "INSERT OR REPLACE INTO wallets (class, student, coins, seq) VALUES (?, ?, ?, ?)",
+                [(class_name, student, float(coins), seq) for (class_name, student), coins in values.items()],
+            )
+        self._transaction(work)
+        return {key: float(coins) for key, coins in values.items()}
+
+    # --- 회차 ---
+    def current_round(self, class_name):
+        # 반의 아직 추첨하지 않은 회차 {"id", "config", "opened_at"} (없으면 None)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT id, config, opened_at FROM rounds WHERE class = ? AND drawn_at IS NULL ORDER BY id DESC LIMIT 1",
+                (class_name,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "config": row[1], "opened_at": row[2]}
+
+    def open_round(self, class_name, config_json, timestamp):
+        # 열린 회차가 있으면 그대로, 없으면 config_json 규칙으로 새 회차를 연다
+        # 예전 lotto_entries.pkl에서 옮겨 온 티켓(round_id 없음)은 새 회차에 넣는다
+        current = self.current_round(class_name)
+        if current is not None:
+            return current
+
+        def work(conn):
+            row = conn.execute(
+                "SELECT id, config, opened_at FROM rounds WHERE class = ? AND drawn_at IS NULL ORDER BY id DESC LIMIT 1",
+                (class_name,),
+            ).fetchone()
+            if row is not None:
+                return {"id": row[0], "config": row[1], "opened_at": row[2]}
+            round_id = conn.execute(
+                "INSERT INTO rounds (class, config, opened_at) VALUES (?, ?, ?)", (class_name, config_json, timestamp)
+            ).lastrowid
+            conn.execute("UPDATE tickets SET round_id = ? WHERE class = ? AND round_id IS NULL", (round_id, class_name))
+            return {"id": round_id, "config": config_json, "opened_at": timestamp}
+        return self._transaction(work)
+
+    def settle_rounds(self, draws, timestamp):
+        # draws: [{"round_id", "main_balls", "bonus_ball", "ticket_ids", "credits"}]
+        # 아직 추첨하지 않은 회차만 추첨한 것으로 표시하고, 그 회차의 당첨금 지급과 티켓 삭제를 같은 트랜잭션에서 처리
+        # (두 화면에서 동시에 추첨하거나 중간에 오류가 나도 같은 티켓으로 두 번 지급하지 않음)
+        # -> (처리한 회차 id 목록, {(반, 학생): 변경 후 잔액})
+        def work(conn):
+            settled = []
+            credits = {}
+            for draw in draws:
+                round_id, ticket_ids = draw["round_id"], draw["ticket_ids"]
+                claimed = conn.execute(
+                    "UPDATE rounds SET drawn_at = ?, main_balls = ?, bonus_ball = ?, tickets = ? "
+                    "WHERE id = ? AND drawn_at IS NULL",
+                    (timestamp, json.dumps(list(draw["main_balls"])), draw["bonus_ball"], len(ticket_ids), round_id),
+                ).rowcount
+                if claimed != 1:
+                    continue  # 다른 세션이 이미 추첨한 회차
+                settled.append(round_id)
+                conn.executemany("DELETE FROM tickets WHERE id = ?", [(int(i),) for i in ticket_ids])
+                # 추첨 중에 새로 산 티켓은 다음 회차로 넘어감
+                conn.execute("UPDATE tickets SET round_id = NULL WHERE round_id = ?", (round_id,))
+                for key, coins in draw["credits"].items():
+                    credits[key] = credits.get(key, 0.0) + coins
+            return settled, (_adjust(conn, credits) if credits else {})
+        return self._transaction(work)
+
+    def rounds(self, class_name, limit=20):
+        # 최근 회차 기록 (최신순)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, opened_at, drawn_at, main_balls, bonus_ball, tickets FROM rounds "
+                "WHERE class = ? ORDER BY id DESC LIMIT ?",
+                (class_name, limit),
+            ).fetchall()
+        return [
+            {
+                "회차": round_id,
+                "시작": opened_at,
+                "추첨": drawn_at,
+                "당첨 번호": json.loads(main_balls) if main_balls else None,
+                "보너스 번호": bonus_ball,
+                "티켓 수": tickets,
+            }
+            for round_id, opened_at, drawn_at, main_balls, bonus_ball, tickets in rows
+        ]
+
+    # --- 티켓 ---
+    def purchase(self, class_name, student, numbers, timestamp, price=1, round_id=None):
+        # 잔액 차감과 티켓 추가를 한 트랜잭션으로 처리하고 남은 잔액을 돌려준다
+        key = numbers_key(numbers)
+
+        def work(conn):
+            if conn.execute(
+                "SELECT 1 FROM tickets WHERE class = ? AND student = ? AND numbers = ?",
+                (class_name, student, key),
+            ).fetchone():
+                raise DuplicateTicket(key)
+            row = conn.execute("SELECT coins FROM wallets WHERE class = ? AND student = ?", (class_name, student)).fetchone()
+            if row is None or row[0] < price:
+                raise InsufficientCoins(student)
+            conn.execute(
+                "UPDATE wallets SET coins = coins - ?, seq = ? WHERE class = ? AND student = ?",
+                (price, _next_seq(conn), class_name, student),
+            )
+            if round_id is not None and conn.execute(
+                "SELECT drawn_at IS NOT NULL FROM rounds WHERE id = ?", (round_id,)
+            ).fetchone() == (1,):
+                current = None  # 구매 도중 추첨이 끝난 회차면 다음 회차로 넘김
+            else:
+                current = round_id
+            conn.execute(
+                "INSERT INTO tickets (class, student, numbers, timestamp, round_id) VALUES (?, ?, ?, ?, ?)",
+                (class_name, student, key, timestamp, current),
+            )
+            return row[0] - price
+        return self._transaction(work)
+
+    def tickets(self, class_name, round_id=None):
+        # round_id를 주면 그 회차의 티켓만
+        query = "SELECT id, student, numbers, timestamp FROM tickets WHERE class = ?"
+        params = [class_name]
+        if round_id is not None:
+            query += " AND round_id = ?"
+            params.append(round_id)
+        with self.lock:
+            rows = self.conn.execute(query + " ORDER BY id", params).fetchall()
+        return [
+            {
+                "id": ticket_id,
+                "반": class_name,
+                "학생": student,
+                "chosen_numbers": [int(n) for n in numbers.split(",")],
+                "timestamp": timestamp,
+            }
+            for ticket_id, student, numbers, timestamp in rows
+        ]
+
+    def ticket_counts(self):
+        # 반별 남은 티켓 수 {반: 개수}
+        with self.lock:
+            return dict(self.conn.execute("SELECT class, COUNT(*) FROM tickets GROUP BY class ORDER BY class").fetchall())
+
+    def import_pickle(self, filename="lotto_entries.pkl"):
+        # 예전 lotto_entries.pkl 티켓을 한 번 옮기고 파일 이름을 바꿔 둔다
+        try:
+            with open(filename, "rb") as f:
+                entries = pickle.load(f)
+        except FileNotFoundError:
+            return 0
+        rows = [
+            (class_name, t["학생"], numbers_key(t["chosen_numbers"]), t.get("timestamp", ""))
+            for class_name, tickets in entries.items()
+            for t in tickets
+        ]
+        self._transaction(lambda conn: conn.executemany(
+            "INSERT OR IGNORE INTO tickets (class, student, numbers, timestamp) VALUES (?, ?, ?, ?)",
+            rows))
+        try:
+            os.replace(filename, filename + ".migrated")
+        except FileNotFoundError:
+            pass  # 다른 프로세스가 먼저 옮김
+        return len(rows)
@@ -0,0 +1,148 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+# --- 비밀번호 확인 ---
+# 시트의 "비밀번호" 컬럼에는 bcrypt 해시를 저장한다. 예전 평문 값은 로그인에 성공할 때
+# 해시로 바꾸거나 교사용 화면에서 한 번에 옮긴다.
+# bcrypt는 한 번에 수백 ms가 걸리므로 세션마다 한 번만 확인하고, 결과는 세션 상태에 남겨
+# 위젯을 누를 때마다 일어나는 재실행에서는 다시 계산하지 않는다.
+
+BCRYPT_ROUNDS = 12
+MAX_BYTES = 72  # bcrypt가 받는 최대 길이
+# 세션 상태에는 입력한 비밀번호 대신 이 프로세스에서만 유효한 키로 만든 요약값을 남김
+_SESSION_KEY = os.urandom(32)
+
+
+class TooManyAttempts(Exception):
+    def __init__(self, seconds):
+        super().__init__(f"{seconds:.0f}초 후에 다시 시도하세요.")
+        self.seconds = seconds
+
+
+def _encode(password):
+    return str(password).encode("utf-8")[:MAX_BYTES]
+
+
+def is_hashed(stored):
+    return str(stored).startswith(("$2a$", "$2b$", "$2y$"))
+
+
+def hash_password(password, rounds=BCRYPT_ROUNDS):
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode("ascii")
+
+
+def check_password(password, stored):
+    # 아직 옮기지 않은 평문 값도 받아들임 (비교 시간이 입력에 따라 달라지지 않도록 compare_digest)
+    if not password or not stored:
+        return False
+    stored = str(stored)
+    if is_hashed(stored):
+        return bcrypt.checkpw(_encode(password), stored.encode("ascii"))
+    return hmac.compare_digest(_encode(password), _encode(stored))
+
+
+def _digest(password):
+    return hmac.new(_SESSION_KEY, _encode(password), hashlib.sha256).hexdigest()
+
+
+def migrate_passwords(data, rounds=BCRYPT_ROUNDS, workers=4, progress=None):
+    # 평문 비밀번호를 해시로 바꿔 data에 쓰고 바뀐 행 번호를 돌려줌 (빈 값은 그대로)
+    # bcrypt는 계산 중 GIL을 놓으므로 스레드 여러 개로 나눠 처리
+    rows = [idx for idx, stored in data["비밀번호"].items() if stored and not is_hashed(stored)]
+    with ThreadPoolExecutor(workers) as pool:
+        for done, (idx, hashed) in enumerate(zip(rows, pool.map(lambda idx: hash_password(data.at[idx, "비밀번호"], rounds), rows)), 1):
+            data.at[idx, "비밀번호"] = hashed
+            if progress is not None:
+                progress(done, len(rows))
+    return rows
+
+
+class LoginLimiter:
+    # key별 실패 횟수를 모든 세션이 공유: window초 안에 max_attempts번 틀리면 lockout초 동안 잠금
+    # (학생은 (반, 학생), 관리자는 접속한 곳마다 따로 세므로 한 사람이 교사를 잠글 수 없음)
+    def __init__(self, max_attempts=5, window=300, lockout=300, clock=time.monotonic):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.lockout = lockout
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.failures = {}  # key -> 최근 실패 시각 목록
+        self.locked_until = {}
+
+    def check(self, key):
+        with self.lock:
+            remaining = self.locked_until.get(key, 0.0) - self.clock()
+            if remaining > 0:
+                raise TooManyAttempts(remaining)
+
+    def failure(self, key):
+        with self.lock:
+            now = self.clock()
+            recent = [t for t in self.failures.get(key, []) if now - t < self.window] + [now]
+            if len(recent) >= self.max_attempts:
+                self.locked_until[key] = now + self.lockout
+                recent = []
+            self.failures[key] = recent
+
+    def success(self, key):
+        with self.lock:
+            self.failures.pop(key, None)
+            self.locked_until.pop(key, None)
+
+
+def _verify(verified, limiter, key, password, stored):
+    # -> (결과, bcrypt로 새로 확인했는지)
+    digest = _digest(password)
+    cached = verified.get(key)
+    if cached is not None and cached[0] == stored and hmac.compare_digest(cached[1], digest):
+        return cached[2], False
+    limiter.check(key)
+    ok = check_password(password, stored)
+    verified[key] = (stored, digest, ok)
+    return ok, True
+
+
+def verify_any(verified, limiter, candidates, password):
+    # candidates: [(key, 저장된 값)] 순서대로 확인해 맞은 key를 돌려줌 (모두 틀리면 None)
+    # 실패는 모두 틀렸을 때만 세므로, 예를 들어 교사가 관리자 비밀번호로 학생 기록을 열어도 학생의 실패로 세지 않음
+    # 잠긴 key는 건너뛰고, 맞은 key가 없으면 TooManyAttempts를 다시 올림
+    if not password:
+        return None
+    failed = []
+    locked = None
+    for key, stored in candidates:
+        try:
+            ok, fresh = _verify(verified, limiter, key, password, stored)
+        except TooManyAttempts as exc:
+            locked = exc
+            continue
+        if ok:
+            if fresh:
+                limiter.success(key)
+            return key
+        if fresh:
+            failed.append(key)
+    for key in failed:
+        limiter.failure(key)
+    if locked is not None:
+        raise locked
+    return None
+
+
+def verify_password(verified, limiter, key, password, stored):
+    # verified: 세션 상태의 dict {key: (저장된 값, 입력 요약값, 결과)}
+    # 같은 입력과 같은 저장 값이면 bcrypt를 다시 돌리지 않고, 실패도 한 번만 센다
+    return verify_any(verified, limiter, [(key, stored)], password) is not None
+
+
+def upgrade_password(verified, key, password, rounds=BCRYPT_ROUNDS):
+    # 평문으로 로그인에 성공한 경우 해시로 바꾸고 세션 확인 결과도 새 값으로 유지
+    hashed = hash_password(password, rounds)
+    verified[key] = (hashed, _digest(password), True)
+    return hashed
@@ -0,0 +1,165 @@
+import os
+import pickle
+import threading
+import time
+
+import pandas as pd
+
+from perf import timer
+from student_index import first_rows
+
+# --- 시트 데이터 캐시 ---
+# 모든 세션이 메모리의 DataFrame 하나를 공유하고, ttl이 지나면 시트 수정 시각(Drive API)만 확인해
+# 바뀌었을 때만 get_all_records로 다시 읽는다. 시트에 연결할 수 없으면 디스크 스냅샷을 사용한다.
+
+
+def frame_from_records(records, pending=None):
+    data = pd.DataFrame(records)
+    # 로또 0.5코인 지급이 가능하도록 코인은 실수형으로, 비밀번호는 문자열로 보관
+    data["세진코인"] = data["세진코인"].astype(float)
+    if "비밀번호" in data.columns:
+        data["비밀번호"] = data["비밀번호"].astype(str)
+    # 아직 시트로 보내지 않은 변경 사항을 덮어씀 {(반, 학생, 컬럼): 값}
+    if pending:
+        rows = first_rows(data)
+        for (class_name, student, column), value in pending.items():
+            if (class_name, student) in rows and column in data.columns:
+                data.at[rows[(class_name, student)], column] = value
+    return data
+
+
+class DataCache:
+    def __init__(self, fetch, revision, snapshot_path="data_cache.pkl", ttl=30, on_reload=None, clock=time.monotonic):
+        self.fetch = fetch  # 시트 전체를 DataFrame으로 읽는 함수
+        self.revision = revision  # 시트 수정 시각을 돌려주는 가벼운 함수
+        self.snapshot_path = snapshot_path
+        self.ttl = ttl
+        self.on_reload = on_reload  # (이전 data, 새 data) -> 시트가 외부에서 바뀌었을 때 호출
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.data = None
+        self.current_revision = None
+        self.checked_at = 0.0
+        self.snapshot_dirty = False  # note_write 후 아직 스냅샷에 저장하지 않음
+        self.version = 0  # 데이터가 새로 로드될 때마다 증가
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.offline = 0
+        self.last_reload_seconds = 0.0
+        self.total_reload_seconds = 0.0
+
+    def get(self):
+        with self.lock:
+            now = self.clock()
+            if self.data is not None and now - self.checked_at < self.ttl:
+                self.hits += 1
+                return self.data
+            try:
+                revision = self.revision()
+            except Exception as exc:
+                return self._offline(now, exc)
+            self.checked_at = now
+            if self.data is not None and revision == self.current_revision:
+                self.revalidations += 1
+                return self.data
+            try:
+                self._reload(revision)
+            except Exception as exc:
+                return self._offline(now, exc)
+            return self.data
+
+    def _reload(self, revision):
+        start = time.perf_counter()
+        data = self.fetch()
+        elapsed = time.perf_counter() - start
+        self.misses += 1
+        self.last_reload_seconds = elapsed
+        self.total_reload_seconds += elapsed
+        previous, self.data = self.data, data
+        self.current_revision = revision
+        self.version += 1
+        self.save_snapshot(data)
+        if previous is not None and self.on_reload is not None:
+            self.on_reload(previous, data)
+
+    def _offline(self, now, exc):
+        # 시트/Drive API에 연결할 수 없으면 마지막 스냅샷으로 버팀
+        self.offline += 1
+        self.checked_at = now
+        if self.data is None:
+            self.data = self.load_snapshot()
+            if self.data is None:
+                raise exc
+            self.version += 1
+        return self.data
+
+    def note_write(self, data):
+        # 이 앱에서 저장한 경우: 메모리 데이터가 가장 최신
+        # 스냅샷은 클릭마다 쓰지 않고 쓰기 지연 큐가 시트에 보낼 때 백그라운드에서 한 번 저장
+        with self.lock:
+            self.data = data
+            self.snapshot_dirty = True
+
+    def note_flushed(self, sent, before, after):
+        # 쓰기 지연 큐가 시트에 보낸 직후(백그라운드 스레드): 보내기 직전 수정 시각이 캐시와 같았다면
+        # 직후의 수정 시각은 이 쓰기로 바뀐 것이므로 채택해 다시 읽지 않음
+        # (그 사이 외부에서 수정했다면 직전 시각이 달라 채택하지 않고 다음 확인 때 다시 읽음)
+        with self.lock:
+            if sent and before is not None and before == self.current_revision and after is not None:
+                self.current_revision = after
+            data, dirty = self.data, self.snapshot_dirty
+            self.snapshot_dirty = False
+        # 전송에 실패해도 저장 (오프라인으로 재시작하면 스냅샷을 쓰므로)
+        if dirty:
+            try:
+                self.save_snapshot(data)
+            except OSError:
+                with self.lock:
+                    self.snapshot_dirty = True  # 다음 전송 때 다시 시도
+
+    def frame_at(self, revision):
+        # 시트 수정 시각이 revision일 때와 행 순서가 같은 data (쓰기 지연 큐가 보낼 셀의 행을 찾을 때)
+        # 캐시가 그보다 오래됐으면 시트를 다시 읽고, 시트를 확인할 수 없으면 보내지 않도록 예외
+        with self.lock:
+            if revision is not None and revision == self.current_revision:
+                return self.data
+        if revision is None:
+            raise RuntimeError("시트 수정 시각을 확인할 수 없습니다.")
+        self.invalidate()
+        data = self.get()
+        with self.lock:
+            if self.current_revision is None:
+                raise RuntimeError("시트를 다시 읽지 못했습니다.")
+        return data
+
+    def invalidate(self):
+        with self.lock:
+            self.checked_at = 0.0
+            self.current_revision = None
+
+    def load_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return None
+        with timer("cache.pickle_load"), open(self.snapshot_path, "rb") as f:
+            return pickle.load(f)
+
+    def save_snapshot(self, data):
+        # 임시 파일에 쓴 뒤 교체해서 동시에 읽는 프로세스가 깨진 파일을 보지 않도록
+        # (다시 읽기와 백그라운드 저장이 겹칠 수 있으므로 스레드마다 다른 임시 파일)
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with timer("cache.pickle_save"), open(tmp_path, "wb") as f:
+            pickle.dump(data, f)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "offline": self.offline,
+            "version": self.version,
+            "revision": self.current_revision,
+            "last_reload_ms": round(self.last_reload_seconds * 1000, 1),
+            "total_reload_ms": round(self.total_reload_seconds * 1000, 1),
+        }
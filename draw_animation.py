@@ -0,0 +1,92 @@
+import html
+import json
+
+# --- 로또 추첨 애니메이션 ---
+# 추첨 결과는 서버에서 먼저 계산/저장하고, 카운트다운과 공 공개 연출은 브라우저에서 재생한다.
+# (서버 스레드가 time.sleep으로 30초 가까이 묶이지 않도록)
+
+LOADING_GIF = "https://media3.giphy.com/media/v1.Y2lkPTc5MGI3NjExZjNmaDVzbTlrYWJrMXZzMGZkam5tOWc5OHQ5eDBhYm94OWxzN2hnZiZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9Zw/APqEbxBsVlkWSuFpth/giphy.gif"
+BALL_GIF = "https://media2.giphy.com/media/v1.Y2lkPTc5MGI3NjExazYzZXp0azhvdjF1M3BtM3JobjVic2Y3ZWIyaTh4ZXpkNDNwdDZtdSZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9Zw/dvgefaMHmaN2g/giphy.gif"
+BALL_LABELS = ["첫번째", "두번째", "세번째", "네번째", "다섯번째", "여섯번째", "일곱번째", "여덟번째", "아홉번째", "열번째"]
+
+TEMPLATE = """
+<style>
+body { color: #ffffff; font-family: 'Orbitron', sans-serif; margin: 0; }
+.stage b, .result p { background-color: rgba(0, 0, 0, 0.7); padding: 4px; }
+.ball { font-size: 300%; background-color: red; color: white; }
+.result { display: none; }
+.result table { border-collapse: collapse; background-color: rgba(0, 0, 0, 0.7); }
+.result th, .result td { border: 1px solid #888; padding: 4px 8px; }
+</style>
+<div class="stage" id="countdown"></div>
+<div class="stage" id="balls"></div>
+<div class="result" id="result">__RESULT__</div>
+<script>
+const draw = __DRAW__;
+const wait = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+const countdown = document.getElementById("countdown");
+const balls = document.getElementById("balls");
+
+async function countDown(seconds, text, image) {
+  for (let i = seconds; i > 0; i--) {
+    countdown.innerHTML = `<b>${text} ${i}초 남음...</b>` + (image ? `<br><img src="${image}" width="200">` : "");
+    await wait(1000);
+  }
+  countdown.innerHTML = "";
+}
+
+async function reveal(label, number, icon) {
+  const el = document.createElement("div");
+  el.innerHTML = `<img src="${draw.ball_gif}" width="200">`;
+  balls.appendChild(el);
+  await wait(3000);
+  el.innerHTML = `<span class="ball">${label} 공: ${number}</span> ${icon}`;
+}
+
+async function run() {
+  await countDown(7, "로또 추첨까지", draw.loading_gif);
+  for (let i = 0; i < draw.main_balls.length; i++) {
+    await reveal(draw.labels[i], draw.main_balls[i], "🎉");
+  }
+  if (draw.bonus_ball !== null) {
+    await countDown(10, "보너스 공 추첨까지", null);
+    await reveal("보너스", draw.bonus_ball, "✨");
+  }
+  document.getElementById("result").style.display = "block";
+}
+run();
+</script>
+"""
+
+
+def ball_labels(count):
+    # 설정에 따라 공 개수가 달라지므로 개수만큼 만들고, 준비된 이름이 모자라면 "11번째"처럼 표시
+    return [BALL_LABELS[i] if i < len(BALL_LABELS) else f"{i + 1}번째" for i in range(count)]
+
+
+def result_html(winners):
+    if not winners:
+        return "<p>아쉽게도 당첨된 티켓이 없습니다.</p>"
+    columns = list(winners[0].keys())
+    head = "".join(f"<th>{html.escape(c)}</th>" for c in columns)
+    rows = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(str(w[c]))}</td>" for c in columns) + "</tr>"
+        for w in winners
+    )
+    return f"<p>로또 당첨 결과:</p><table><tr>{head}</tr>{rows}</table>"
+
+
+def animation_html(main_balls, bonus_ball, winners):
+    draw = {
+        "main_balls": list(main_balls),
+        "bonus_ball": bonus_ball,
+        "labels": ball_labels(len(main_balls)),
+        "loading_gif": LOADING_GIF,
+        "ball_gif": BALL_GIF,
+    }
+    return TEMPLATE.replace("__DRAW__", json.dumps(draw)).replace("__RESULT__", result_html(winners))
+
+
+def animation_height(main_balls, bonus_ball, winners):
+    balls = len(main_balls) + (1 if bonus_ball is not None else 0)
+    return 260 + 80 * balls + 40 * (len(winners) + 2)
@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from lotto_engine import DEFAULT_CONFIG
+
+# --- 로또 추첨 정산 ---
+# 반의 모든 티켓을 번호 비트마스크(1~pool번 -> pool비트, 최대 64) 배열로 만들어
+# 일치 개수와 보너스 적중 여부를 한 번에 계산하고, 학생별 코인 지급액을 합산한다.
+# 등수와 보상은 회차의 LottoConfig를 따른다.
+# 여러 반을 한 번에 추첨할 때는 반마다 독립된 난수 스트림(SeedSequence.spawn)으로 동시에 정산하고
+# 코인 지급은 호출하는 쪽에서 한 번에 반영한다.
+
+
+def numbers_mask(numbers):
+    mask = 0
+    for n in numbers:
+        mask |= 1 << (int(n) - 1)
+    return mask
+
+
+def ticket_masks(tickets):
+    if not tickets:
+        return np.zeros(0, dtype=np.uint64)
+    numbers = np.array([t["chosen_numbers"] for t in tickets], dtype=np.uint64)
+    return np.bitwise_or.reduce(np.uint64(1) << (numbers - np.uint64(1)), axis=1)
+
+
+def popcount(masks):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks).astype(np.int8)
+    bits = np.unpackbits(masks.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1)
+    return bits.sum(axis=1).astype(np.int8)
+
+
+def match_counts(masks, main_balls):
+    return popcount(masks & np.uint64(numbers_mask(main_balls)))
+
+
+def settle_tickets(tickets, main_balls, bonus_ball=None, masks=None, config=DEFAULT_CONFIG):
+    # 티켓별 보상과 학생별 코인 지급액만 계산하고, 데이터 반영은 호출하는 쪽에서 한다
+    if masks is None:
+        masks = ticket_masks(tickets)
+    counts = match_counts(masks, main_balls)
+    bonus_hit = np.zeros(len(masks), dtype=bool)
+    if bonus_ball is not None:
+        bonus_hit = (masks & np.uint64(numbers_mask([bonus_ball]))) != 0
+    tier = config.classify(counts, bonus_hit)
+    rewards = config.tier_names[tier]  # -1(낙첨)은 마지막 칸(None)
+    credits = config.tier_coins[tier]
+    # 학생 (반, 학생)마다 번호를 붙여 지급액을 bincount로 합산
+    codes = {}
+    student_ids = np.array([codes.setdefault((t["반"], t["학생"]), len(codes)) for t in tickets], dtype=np.int64)
+    totals = np.bincount(student_ids, weights=credits, minlength=len(codes))
+
+    winners = [
+        {
+            "반": tickets[i]["반"],
+            "학생": tickets[i]["학생"],
+            "당첨 보상": rewards[i],
+            "선택 번호": tickets[i]["chosen_numbers"],
+            "당첨 번호": main_balls,
+        }
+        for i in np.flatnonzero(tier >= 0).tolist()
+    ]
+    return {
+        "winners": winners,
+        "credits": {key: total for key, total in zip(codes, totals.tolist()) if total > 0},
+    }
+
+
+def draw_and_settle(tickets, config, rng):
+    # rng: numpy Generator -> (본 번호, 보너스 번호 또는 None, 정산 결과)
+    main_balls, bonus_ball = config.draw(rng)
+    masks = ticket_masks(tickets)
+    if not config.bonus_needed(match_counts(masks, main_balls)):
+        bonus_ball = None
+    return main_balls, bonus_ball, settle_tickets(tickets, main_balls, bonus_ball, masks, config)
+
+
+def draw_classes(pools, seed=None, workers=4):
+    # pools: {반: (티켓 목록, LottoConfig)} -> ({반: {"main_balls", "bonus_ball", "settlement"}}, 시드 엔트로피)
+    # 반마다 부모 시드에서 갈라진 스트림을 쓰므로 순서나 스레드 배치와 관계없이 같은 시드면 같은 결과
+    root = np.random.SeedSequence(seed)
+    streams = dict(zip(pools, root.spawn(len(pools))))
+    with ThreadPoolExecutor(workers) as executor:
+        futures = {
+            class_name: executor.submit(draw_and_settle, tickets, config, np.random.default_rng(streams[class_name]))
+            for class_name, (tickets, config) in pools.items()
+        }
+        results = {}
+        for class_name, future in futures.items():
+            main_balls, bonus_ball, settlement = future.result()
+            results[class_name] = {"main_balls": main_balls, "bonus_ball": bonus_ball, "settlement": settlement}
+    return results, root.entropy
+
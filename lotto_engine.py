@@ -0,0 +1,166 @@
+import json
+from fractions import Fraction
+from math import comb
+
+import numpy as np
+
+# --- 로또 규칙 / 확률 ---
+# 번호 범위(pool), 고르는 개수(picks), 티켓 가격, 등수별 보상을 한 설정으로 묶는다.
+# 회차마다 설정을 함께 저장하므로 규칙을 바꿔도 이미 열린 회차는 원래 규칙으로 정산된다.
+# 설정별 정확한 당첨 확률과 티켓 한 장의 기대 지급액을 미리 계산하고,
+# 코인 경제를 조정할 때는 수백만 번의 추첨을 numpy로 한 번에 시뮬레이션한다.
+
+
+class Tier:
+    # matches: 맞힌 번호 수, bonus: True/False면 보너스 번호 적중 여부까지 봄 (None이면 상관없음)
+    # coins: 자동 지급할 코인, value: 물품 보상의 코인 환산 가치 (기대값 계산용, 없으면 coins)
+    def __init__(self, name, matches, bonus=None, coins=0.0, value=None):
+        self.name = name
+        self.matches = int(matches)
+        self.bonus = bonus
+        self.coins = float(coins)
+        self.value = self.coins if value is None else float(value)
+
+    def to_dict(self):
+        return {"name": self.name, "matches": self.matches, "bonus": self.bonus, "coins": self.coins, "value": self.value}
+
+
+# 기존 규칙: 1~20 중 3개, 3개 일치 치킨 / 2개+보너스 햄버거세트 / 2개 매점이용권 / 1개 0.5코인
+DEFAULT_TIERS = [
+    Tier("치킨", 3),
+    Tier("햄버거세트", 2, bonus=True),
+    Tier("매점이용권", 2, bonus=False),
+    Tier("0.5코인", 1, coins=0.5),
+]
+
+
+class LottoConfig:
+    def __init__(self, pool=20, picks=3, price=1, tiers=None):
+        self.pool = int(pool)
+        self.picks = int(picks)
+        self.price = float(price)
+        self.tiers = list(DEFAULT_TIERS if tiers is None else tiers)
+        if not 0 < self.picks <= self.pool <= 64:
+            raise ValueError("번호는 1~64 범위에서 pool 이하로 골라야 합니다.")
+        # 보너스 번호가 필요한 일치 개수 (이 개수를 맞힌 티켓이 있을 때만 보너스 번호를 뽑음)
+        self.bonus_matches = sorted({t.matches for t in self.tiers if t.bonus is not None})
+        if self.bonus_matches and self.pool == self.picks:
+            raise ValueError("보너스 번호를 뽑으려면 pool이 picks보다 커야 합니다.")
+        self.tier_coins = np.array([t.coins for t in self.tiers] + [0.0])  # 마지막 칸은 낙첨
+        self.tier_names = np.array([t.name for t in self.tiers] + [None], dtype=object)
+        self.odds = exact_odds(self)
+
+    @classmethod
+    def from_dict(cls, values):
+        values = dict(values)
+        if "tiers" in values:
+            values["tiers"] = [Tier(**t) for t in values["tiers"]]
+        return cls(**values)
+
+    def to_dict(self):
+        return {"pool": self.pool, "picks": self.picks, "price": self.price, "tiers": [t.to_dict() for t in self.tiers]}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    @property
+    def reward_names(self):
+        return [t.name for t in self.tiers]
+
+    def tier_of(self, matches, bonus_hit):
+        # 앞에 있는 등수가 우선
+        for i, t in enumerate(self.tiers):
+            if t.matches == matches and (t.bonus is None or t.bonus == bonus_hit):
+                return i
+        return -1
+
+    def classify(self, counts, bonus_hit):
+        # 티켓별 등수 번호 배열 (-1은 낙첨)
+        tier = np.full(len(counts), -1, dtype=np.int16)
+        for i, t in reversed(list(enumerate(self.tiers))):
+            hit = counts == t.matches
+            if t.bonus is not None:
+                hit &= bonus_hit == t.bonus
+            tier[hit] = i
+        return tier
+
+    def bonus_needed(self, counts):
+        return bool(np.isin(counts, self.bonus_matches).any())
+
+    def draw(self, rng):
+        # rng: numpy Generator -> (뽑힌 순서대로의 본 번호, 보너스 번호 후보)
+        # 보너스 번호는 bonus_needed일 때만 사용
+        balls = (rng.permutation(self.pool)[: self.picks + 1] + 1).tolist()
+        return balls[: self.picks], (balls[self.picks] if len(balls) > self.picks else None)
+
+
+def exact_odds(config):
+    # 등수별 정확한 확률(Fraction)과 티켓 한 장의 기대 지급액
+    total = comb(config.pool, config.picks)
+    probs = [Fraction(0)] * len(config.tiers)
+    for m in range(config.picks + 1):
+        p_match = Fraction(comb(config.picks, m) * comb(config.pool - config.picks, config.picks - m), total)
+        if p_match == 0:
+            continue
+        # 보너스 번호는 본 번호를 뺀 나머지에서 뽑으므로 내 번호 중 맞히지 못한 (picks - m)개 중 하나일 확률
+        rest = config.pool - config.picks
+        p_bonus = Fraction(config.picks - m, rest) if rest else Fraction(0)
+        for bonus_hit, p in ((True, p_bonus), (False, 1 - p_bonus)):
+            tier = config.tier_of(m, bonus_hit)
+            if tier >= 0 and p:
+                probs[tier] += p_match * p
+    expected_coins = sum(p * Fraction(t.coins) for p, t in zip(probs, config.tiers))
+    expected_value = sum(p * Fraction(t.value) for p, t in zip(probs, config.tiers))
+    return {
+        "tiers": [
+            {"등수": t.name, "확률": float(p), "1/N": float(1 / p) if p else None, "지급 코인": t.coins}
+            for t, p in zip(config.tiers, probs)
+        ],
+        "win_probability": float(sum(probs)),
+        "expected_coins": float(expected_coins),
+        "expected_value": float(expected_value),
+        "coin_return": float(expected_coins / Fraction(config.price)) if config.price else None,
+    }
+
+
+def simulate(config, draws=1_000_000, seed=None, batch=None):
+    # 추첨을 draws번 시뮬레이션 (티켓 한 장 기준)
+    # 번호 배치는 대칭이므로 티켓을 1..picks로 고정하고 무작위 키의 순위로 본 번호/보너스 번호를 뽑는다
+    rng = np.random.default_rng(seed)
+    batch = batch or max(1, 4_000_000 // config.pool)
+    kth = min(config.picks, config.pool - 1)
+    hits = np.zeros(len(config.tiers) + 1, dtype=np.int64)
+    payout = 0.0
+    payout_sq = 0.0
+    for start in range(0, draws, batch):
+        n = min(batch, draws - start)
+        order = np.argpartition(rng.random((n, config.pool)), kth, axis=1)
+        counts = (order[:, : config.picks] < config.picks).sum(axis=1)
+        if config.pool > config.picks:
+            bonus_hit = order[:, config.picks] < config.picks
+        else:
+            bonus_hit = np.zeros(n, dtype=bool)
+        tier = config.classify(counts, bonus_hit)
+        hits += np.bincount(tier % len(hits), minlength=len(hits))  # -1(낙첨)은 마지막 칸
+        coins = config.tier_coins[tier]
+        payout += float(coins.sum())
+        payout_sq += float((coins * coins).sum())
+    mean = payout / draws
+    std = max(payout_sq / draws - mean * mean, 0.0) ** 0.5
+    return {
+        "draws": draws,
+        "tiers": [
+            {"등수": t.name, "당첨 수": int(h), "빈도": h / draws, "정확한 확률": o["확률"]}
+            for t, h, o in zip(config.tiers, hits[:-1].tolist(), config.odds["tiers"])
+        ],
+        "mean_coins": mean,
+        "std_error": std / draws ** 0.5,
+        "coin_return": mean / config.price if config.price else None,
+    }
+
+
+DEFAULT_CONFIG = LottoConfig()
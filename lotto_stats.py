@@ -0,0 +1,72 @@
+import threading
+
+from lotto_engine import DEFAULT_TIERS
+
+# --- 로또 당첨 통계 ---
+# 활동 기록에서 새로 추가된 당첨 기록만 읽어 누적 카운터와 당첨자 목록을 갱신한다.
+# 통계용 화면은 매번 전체 기록을 파싱하지 않고 이 카운터를 그대로 보여준다.
+
+LOTTO_ACTIVITY = "로또 당첨"
+REWARDS = [t.name for t in DEFAULT_TIERS]
+TOP_REWARDS = [t.name for t in DEFAULT_TIERS if not t.coins]  # 코인이 아닌 물품 보상
+
+
+class LottoStats:
+    def __init__(self, rewards=REWARDS, top_rewards=TOP_REWARDS):
+        self.lock = threading.Lock()
+        self.rewards = list(rewards)
+        self.top_rewards = list(top_rewards)
+        self.last_id = 0
+        self.totals = self.empty_counts()
+        self.by_class = {}
+        self.by_date = {}
+        self.by_student = {}  # (반, 학생) -> [(보상, 날짜)]
+        self.winners = []  # 3등 이상 당첨자
+
+    def empty_counts(self):
+        return dict.fromkeys(self.rewards, 0)
+
+    def refresh(self, activity_log):
+        # 마지막으로 읽은 기록 이후의 당첨만 반영
+        with self.lock:
+            for record in activity_log.by_activity(LOTTO_ACTIVITY, after_id=self.last_id):
+                self._add(record["class"], record["student"], record["reward"], record["timestamp"])
+                self.last_id = record["id"]
+
+    def _add(self, class_name, student, reward, timestamp):
+        if reward not in self.totals:
+            return
+        date = (timestamp or "")[:10]
+        self.totals[reward] += 1
+        self.by_class.setdefault(class_name, self.empty_counts())[reward] += 1
+        self.by_date.setdefault(date, self.empty_counts())[reward] += 1
+        self.by_student.setdefault((class_name, student), []).append((reward, date))
+        if reward in self.top_rewards:
+            self.winners.append({"반": class_name, "학생": student, "당첨 보상": reward, "당첨 날짜": timestamp})
+
+    def forget(self, class_name, student):
+        # 학생 기록이 초기화되면 그 학생의 당첨 기록을 통계에서 제외
+        with self.lock:
+            for reward, date in self.by_student.pop((class_name, student), []):
+                self.totals[reward] -= 1
+                self.by_class[class_name][reward] -= 1
+                self.by_date[date][reward] -= 1
+            self.winners = [w for w in self.winners if (w["반"], w["학생"]) != (class_name, student)]
+
+    def summary(self):
+        with self.lock:
+            return dict(self.totals)
+
+    def winners_list(self, class_name=None):
+        with self.lock:
+            if class_name is None:
+                return list(self.winners)
+            return [w for w in self.winners if w["반"] == class_name]
+
+    def class_breakdown(self):
+        with self.lock:
+            return {name: dict(counts) for name, counts in sorted(self.by_class.items())}
+
+    def date_breakdown(self):
+        with self.lock:
+            return {date: dict(counts) for date, counts in sorted(self.by_date.items())}
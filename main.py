@@ -1,16 +1,28 @@
 import streamlit as st
 import pandas as pd
-import ast
 from datetime import datetime, timedelta, timezone
-import random
-import time
-import gspread
-from google.oauth2.service_account import Credentials
-import os
-import pickle
+import math
+import uuid
+import numpy as np
+from sheet_sync import ChangeTracker, LogMirror, SheetPool, WriteBehind, log_worksheet, save_changes
+from activity_log import ActivityLog
+from lotto_stats import LottoStats
+from lotto_draw import draw_and_settle, draw_classes
+from lotto_engine import LottoConfig, simulate
+from draw_animation import animation_height, animation_html
+from coin_store import CoinStore, DuplicateTicket, InsufficientCoins
+from data_cache import DataCache, frame_from_records
+from student_index import StudentIndex
+from perf import metrics, timed, timer
+from bulk_ops import apply_coin_change, apply_settlements, preview_coin_change, select_rows, sheet_balances, undo_coin_change, write_balances
+from credentials import LoginLimiter, TooManyAttempts, hash_password, is_hashed, migrate_passwords, upgrade_password, verify_any
 
 # --- Google Sheets API 연결 ---
-def connect_gsheet():
+# gspread / google-auth는 무거우므로 시트에 처음 연결할 때만 import
+@timed("connect_gsheet")
+def open_gsheet():
+    import gspread
+    from google.oauth2.service_account import Credentials
     creds = Credentials.from_service_account_info(
         st.secrets["Drive"],
         scopes=["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
@@ -20,152 +32,331 @@ def connect_gsheet():
     sheet = client.open_by_url(sheet_url).sheet1
     return sheet
 
-# 캐시된 데이터를 로드/저장하는 함수들
-def load_data_from_cache():
-    cache_file = "data_cache.pkl"
-    if os.path.exists(cache_file):
-        with open(cache_file, "rb") as f:
-            return pickle.load(f)
-    else:
-        return None
+# 모든 세션이 하나의 클라이언트를 공유 (만료 시 재연결, 일시 오류 재시도)
+@st.cache_resource
+def get_sheet_pool():
+    return SheetPool(open_gsheet)
+
+def connect_gsheet():
+    return get_sheet_pool()
+
+# 활동 기록 사본 워크시트 (없으면 만듦)
+def open_log_sheet():
+    return log_worksheet(open_gsheet().spreadsheet)
 
-def save_data_to_cache(data):
-    with open("data_cache.pkl", "wb") as f:
-        pickle.dump(data, f)
+# 시트 수정 시각 (Drive API로 가볍게 확인)
+def sheet_revision():
+    return get_sheet_pool().worksheet().spreadsheet.get_lastUpdateTime()
 
 # Google Sheets 데이터 로드 및 저장
+@timed("get_all_records")
+def fetch_data():
+    sheet = connect_gsheet()
+    return frame_from_records(sheet.get_all_records(), get_write_behind().pending_cells())
+
+# 시트가 외부에서 수정된 경우 바뀐 잔액만 잔액 저장소에 반영 (행을 끼워 넣거나 정렬해도 (반, 학생)으로 비교)
+def sync_external_edits(previous, data):
+    coin_store = get_coin_store(data)
+    before = sheet_balances(previous)
+    changed = {key: coins for key, coins in sheet_balances(data).items() if before.get(key) != coins}
+    if changed:
+        coin_store.set_balances(changed)
+
+# 모든 세션이 공유하는 데이터 캐시 (30초마다 시트 수정 여부 확인, 오프라인이면 스냅샷 사용)
+@st.cache_resource
+def get_data_cache():
+    return DataCache(fetch_data, sheet_revision, "data_cache.pkl", ttl=30, on_reload=sync_external_edits)
+
+@timed("load_data")
 def load_data():
-    cached_data = load_data_from_cache()
-    if cached_data is not None:
-        return cached_data
-    else:
-        sheet = connect_gsheet()
-        data = pd.DataFrame(sheet.get_all_records())
-        save_data_to_cache(data)
-        return data
+    return get_data_cache().get()
+
+# 반/학생 색인은 데이터 버전마다 한 번만 만들어 모든 세션이 공유
+# (앱에서의 저장은 반/학생 컬럼을 바꾸지 않으므로 새 버전이 로드될 때만 다시 만듦)
+@st.cache_resource(max_entries=2)
+def get_student_index(version, _data):
+    return StudentIndex(_data)
 
+# 시트 쓰기는 백그라운드에서 모아서 전송 (journal 파일로 재시작 시에도 유실 없음)
+# 보낸 직후의 수정 시각은 데이터 캐시가 채택해 자기 쓰기 때문에 시트를 다시 읽지 않음
+# 보낼 셀의 행은 보내기 직전 수정 시각의 시트에서 (반, 학생)으로 찾음 (캐시가 오래됐으면 다시 읽음)
+@st.cache_resource
+def get_write_behind():
+    cache = get_data_cache()
+    return WriteBehind(
+        get_sheet_pool(), "sheet_journal.jsonl", interval=2.0,
+        revision=sheet_revision, on_flush=cache.note_flushed, frame=cache.frame_at,
+    ).start()
+
+# 변경된 셀만 시트에 반영 (변경 사항이 없으면 시트 요청 생략)
+tracker = ChangeTracker()
+
+def set_cell(student_index, column, value):
+    data.at[student_index, column] = value
+    tracker.mark(student_index, column)
+
+@timed("save_data")
 def save_data(data):
-    sheet = connect_gsheet()
-    sheet.update([data.columns.values.tolist()] + data.values.tolist())
-    save_data_to_cache(data)
+    save_changes(data, tracker, get_write_behind(), get_data_cache())
+
+# 새 활동 기록은 "활동 기록" 워크시트에도 백그라운드로 덧붙임 (로컬 DB를 잃어도 복원할 수 있도록)
+# 이 쓰기로 바뀐 수정 시각도 데이터 캐시가 채택해 시트를 다시 읽지 않음
+@st.cache_resource
+def get_log_mirror():
+    return LogMirror(
+        SheetPool(open_log_sheet), "log_journal.jsonl",
+        revision=sheet_revision, on_flush=get_data_cache().note_flushed,
+    ).start()
+
+# 활동 기록 저장소 (로컬 DB가 있으면 시트를 읽지 않음)
+# DB가 없으면 사본 워크시트에서 복원하고, 사본도 비어 있을 때만 처음 한 번 기존 "기록" 컬럼을 옮겨옴
+@st.cache_resource
+def get_activity_log():
+    log_mirror = get_log_mirror()
+    activity_log = ActivityLog(on_append=log_mirror.add)
+    if not activity_log.migrated():
+        entries = log_mirror.entries()
+        if entries:
+            activity_log.restore(entries)
+        else:
+            activity_log.migrate_from_records(load_data())
+    if not activity_log.mirrored():
+        # 사본을 만들기 전부터 있던 기록(옮겨온 기록 포함)은 한 번에 올림
+        log_mirror.add(activity_log.entries())
+        activity_log.mark_mirrored()
+    return activity_log
+
+# 로또 규칙 (secrets의 [lotto] 섹션이 있으면 그 값, 없으면 기존 규칙) - 확률은 설정마다 한 번만 계산
+@st.cache_resource
+def get_lotto_config():
+    return LottoConfig.from_dict(st.secrets.get("lotto", {}))
+
+@st.cache_resource
+def config_from_json(text):
+    return LottoConfig.from_json(text)
+
+# 반의 현재 회차 규칙 (열린 회차가 없으면 다음 회차에 쓸 규칙)
+def round_config(class_name):
+    current = coin_store.current_round(class_name)
+    return config_from_json(current["config"]) if current else get_lotto_config()
+
+# 로또 당첨 통계 (새 당첨 기록만 반영해 누적)
+@st.cache_resource
+def get_lotto_stats():
+    config = get_lotto_config()
+    return LottoStats(config.reward_names, [t.name for t in config.tiers if not t.coins])
+
+def now_kst():
+    kst = timezone(timedelta(hours=9))
+    return datetime.now(kst).strftime("%Y-%m-%d %H:%M:%S")
 
 # 기록을 추가하는 함수 (KST 적용)
+@timed("add_record")
 def add_record(student_index, activity, reward=None, additional_info=None):
-    kst = timezone(timedelta(hours=9))
-    timestamp = datetime.now(kst).strftime("%Y-%m-%d %H:%M:%S")
-    record_list = ast.literal_eval(data.at[student_index, "기록"])
-    new_record = {
-        "timestamp": timestamp,
-        "activity": activity,
-        "reward": reward,
-        "additional_info": additional_info
-    }
-    record_list.append(new_record)
-    data.at[student_index, "기록"] = str(record_list)
-
-# --- 로또 티켓 정보를 저장하는 함수 ---
-def load_lotto_entries():
-    filename = "lotto_entries.pkl"
-    if os.path.exists(filename):
-        with open(filename, "rb") as f:
-            entries = pickle.load(f)
+    activity_log.append(now_kst(), data.at[student_index, "반"], data.at[student_index, "학생"], activity, reward, additional_info)
+
+# 기록을 초기화하고 초기화 기록을 남기는 함수
+def reset_record(student_index, activity, additional_info=None):
+    activity_log.reset(now_kst(), data.at[student_index, "반"], data.at[student_index, "학생"], activity, additional_info)
+    lotto_stats.forget(data.at[student_index, "반"], data.at[student_index, "학생"])
+
+# 코인 잔액 / 로또 티켓 저장소 (프로세스가 시작할 때 시트 잔액으로 맞추고 예전 티켓 파일을 옮겨옴)
+# 시트 대신 스냅샷으로 시작한 경우에는 저장소 쪽이 더 최신이므로 저장소에 없는 학생만 스냅샷 잔액으로 채움
+@st.cache_resource
+def get_coin_store(_data):
+    coin_store = CoinStore()
+    if get_data_cache().current_revision is not None:
+        coin_store.set_balances(sheet_balances(_data))
     else:
-        entries = {}  # key: 반 이름, value: 로또 티켓 목록 (각 티켓은 dict)
-    return entries
+        coin_store.seed_balances(sheet_balances(_data))
+    coin_store.import_pickle("lotto_entries.pkl")
+    return coin_store
+
+# 코인 변경은 잔액 저장소에서 원자적으로 처리한 뒤 시트 데이터의 해당 행에 반영 ({(반, 학생): 값})
+def change_coins(deltas):
+    write_balances(data, tracker, coin_store.adjust_balances(deltas), students.rows)
+
+def set_coins(values):
+    write_balances(data, tracker, coin_store.set_balances(values), students.rows)
+
+# 로또 정산 반영 (bulk_ops.apply_settlements) -> 실제로 정산한 draws
+def settle_draws(draws):
+    return apply_settlements(data, tracker, coin_store, activity_log, students.rows, draws, now_kst())
+
+# 다른 세션/프로세스에서 바뀐 잔액만 시트 데이터에 반영
+# 마지막으로 반영한 data와 잔액 저장소의 변경 번호를 함께 기억 (새로 로드된 data에는 처음 한 번 전체 반영)
+@st.cache_resource
+def get_balance_cursor():
+    return {"last": (None, 0)}
 
-def save_lotto_entries(entries):
-    with open("lotto_entries.pkl", "wb") as f:
-        pickle.dump(entries, f)
+def refresh_balances():
+    cursor = get_balance_cursor()
+    last_data, last_seq = cursor["last"]
+    seq, changed = coin_store.changes_since(last_seq if last_data is data else 0)
+    found = [(students.rows[key], coins) for key, coins in changed.items() if key in students.rows]
+    if found:
+        data.loc[[idx for idx, _ in found], "세진코인"] = [coins for _, coins in found]
+    cursor["last"] = (data, seq)
+
+def winner_rows(settlement):
+    return [{key: w[key] for key in ("학생", "당첨 보상", "선택 번호", "당첨 번호")} for w in settlement["winners"]]
+
+# 로그인 실패 횟수는 모든 세션이 공유 (학생별로 잠금)
+@st.cache_resource
+def get_login_limiter():
+    return LoginLimiter()
+
+def login(candidates, password):
+    # 세션마다 한 번만 bcrypt로 확인하고 결과는 세션 상태에 보관 -> 맞은 key (없으면 None)
+    verified = st.session_state.setdefault("verified_logins", {})
+    try:
+        return verify_any(verified, get_login_limiter(), candidates, password)
+    except TooManyAttempts as exc:
+        st.error(f"비밀번호를 여러 번 틀려 잠시 로그인할 수 없습니다. {exc}")
+        return None
+
+def client_id():
+    # 접속한 곳 구분: IP를 알 수 없으면 세션마다 만든 임의 값
+    return st.context.ip_address or st.session_state.setdefault("client_id", uuid.uuid4().hex)
+
+def admin_credentials():
+    # 관리자 실패 횟수는 접속한 곳별로 세어, 다른 사람이 틀려도 교사 로그인이 잠기지 않게 함
+    return ("관리자", client_id()), st.secrets["general"]["admin_password"]
+
+def admin_login(password):
+    return login([admin_credentials()], password) is not None
+
+def student_login(student_index, password, allow_admin=False):
+    # allow_admin: 관리자 비밀번호도 받음 (둘 다 틀렸을 때만 실패로 셈)
+    key = (data.at[student_index, "반"], data.at[student_index, "학생"])
+    stored = data.at[student_index, "비밀번호"]
+    matched = login([(key, stored)] + ([admin_credentials()] if allow_admin else []), password)
+    if matched is None:
+        return False
+    if matched == key and not is_hashed(stored):
+        # 아직 평문으로 저장된 비밀번호는 로그인에 성공한 김에 해시로 교체
+        set_cell(student_index, "비밀번호", upgrade_password(st.session_state["verified_logins"], key, password))
+        save_data(data)
+    return True
+
+# 로그 확인 화면에서 한 페이지에 보여줄 기록 수
+LOG_PAGE_SIZE = 20
 
 # --- BGM 재생 함수 ---
 def render_bgm():
     st.audio("bgm.mp3", format="audio/mp3")
 
 # --- 🌟 UI 스타일 ---
-st.markdown(
-    """
-    <style>
-    .stApp {
-        background: url('https://i.ibb.co/vCZs9W58/bgi2.jpg') no-repeat center center fixed !important;
-        background-size: cover !important;
-    }
-    .content-container {
-        background-color: rgba(0, 0, 0, 0.7);
-        padding: 20px;
-        border-radius: 10px;
-        max-width: 800px;
-        margin: auto;
-        font-size: 1.2em;
-    }
-    .header-img {
-        width: 100%;
-        max-height: 300px;
-        object-fit: cover;
-        border-radius: 10px;
-        margin-bottom: 20px;
-    }
-    p, h1, h2, h3, h4, h5, h6 {
-        background-color: rgba(0, 0, 0, 0.7);
-        padding: 4px;
-    }
-    html, body, [class*="css"] {
-        color: #ffffff;
-        font-family: 'Orbitron', sans-serif;
-    }
-    .stButton>button {
-        background-color: #808080 !important;
-        color: #fff;
-        font-weight: bold;
-        border: none;
-        border-radius: 8px;
-        padding: 10px 20px;
-        font-size: 16px;
-        transition: transform 0.2s ease-in-out;
-        box-shadow: 0px 4px 6px rgba(0,0,0,0.3);
-    }
-    /* 공 버튼 스타일 */
-    div.ball-button > button {
-        border-radius: 50%;
-        width: 50px;
-        height: 50px;
-        font-size: 16px;
-        margin: 5px;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+# 스타일과 헤더는 모듈 상수로 두고 한 번의 markdown으로 출력
+PAGE_STYLE = """
+<style>
+.stApp {
+    background: url('app/static/bgi2.jpg') no-repeat center center fixed !important;
+    background-size: cover !important;
+}
+.content-container {
+    background-color: rgba(0, 0, 0, 0.7);
+    padding: 20px;
+    border-radius: 10px;
+    max-width: 800px;
+    margin: auto;
+    font-size: 1.2em;
+}
+.header-img {
+    width: 100%;
+    max-height: 300px;
+    object-fit: cover;
+    border-radius: 10px;
+    margin-bottom: 20px;
+}
+p, h1, h2, h3, h4, h5, h6 {
+    background-color: rgba(0, 0, 0, 0.7);
+    padding: 4px;
+}
+html, body, [class*="css"] {
+    color: #ffffff;
+    font-family: 'Orbitron', sans-serif;
+}
+.stButton>button {
+    background-color: #808080 !important;
+    color: #fff;
+    font-weight: bold;
+    border: none;
+    border-radius: 8px;
+    padding: 10px 20px;
+    font-size: 16px;
+    transition: transform 0.2s ease-in-out;
+    box-shadow: 0px 4px 6px rgba(0,0,0,0.3);
+}
+/* 공 버튼 스타일 */
+div.ball-button > button {
+    border-radius: 50%;
+    width: 50px;
+    height: 50px;
+    font-size: 16px;
+    margin: 5px;
+}
+</style>
+"""
 
 # 헤더 이미지 및 제목
-st.markdown(
+PAGE_HEADER = (
     '<div style="text-align:center;">'
     '<img class="header-img" src="https://media1.giphy.com/media/v1.Y2lkPTc5MGI3NjExemVldTNsMGVpMjZzdjhzc3hnbzl0d2szYjNoNXY2ZGt4ZXVtNncyciZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9Zw/30VBSGB7QW1RJpNcHO/giphy.gif" alt="Bitcoin GIF">'
-    '</div>',
-    unsafe_allow_html=True
+    '</div>'
+    '<h1 style="text-align:center; font-size:3em; color:yellow; background-color:rgba(0,0,0,0.7); padding:10px; border-radius:10px;">$$세진코인$$</h1>'
+    '<div class="content-container">'
 )
-st.markdown('<h1 style="text-align:center; font-size:3em; color:yellow; background-color:rgba(0,0,0,0.7); padding:10px; border-radius:10px;">$$세진코인$$</h1>', unsafe_allow_html=True)
-st.markdown('<div class="content-container">', unsafe_allow_html=True)
+
+# 배경 이미지는 static/ 폴더에서 제공 (.streamlit/config.toml의 enableStaticServing)
+st.markdown(PAGE_STYLE + PAGE_HEADER, unsafe_allow_html=True)
 
 # --- 모드 선택 ---
-user_type = st.sidebar.radio("모드를 선택하세요", ["학생용", "교사용", "통계용", "로그 확인"])
-data = load_data()
+user_type = st.sidebar.radio("모드를 선택하세요", ["학생용", "교사용", "통계용", "로그 확인"], key="mode")
+activity_log = get_activity_log()
+lotto_stats = get_lotto_stats()
+# 통계용은 활동 기록만 쓰므로 시트 데이터/잔액 저장소를 읽지 않음
+if user_type != "통계용":
+    data = load_data()
+    students = get_student_index(get_data_cache().version, data)
+    coin_store = get_coin_store(data)
+    refresh_balances()
 
 # ================================
 # 교사용 모드
 # ================================
 if user_type == "교사용":
     st.header("교사용 모드")
-    selected_class = st.selectbox("반을 선택하세요:", data["반"].unique())
-    filtered_data = data[data["반"] == selected_class]
-    selected_student = st.selectbox("학생을 선택하세요:", filtered_data["학생"].tolist())
-    student_index = data[(data["반"] == selected_class) & (data["학생"] == selected_student)].index[0]
+    selected_class = st.selectbox("반을 선택하세요:", students.classes)
+    selected_student = st.selectbox("학생을 선택하세요:", students.students(selected_class))
+    student_index = students.locate(selected_class, selected_student)
     password = st.text_input("관리자 비밀번호를 입력하세요:", type="password")
-    if password == st.secrets["general"]["admin_password"]:
+    if admin_login(password):
         render_bgm()  # 관리자 BGM 재생
+        with st.sidebar.expander("데이터 캐시 상태"):
+            st.write(get_data_cache().stats())
+            st.write(get_write_behind().stats())
+            st.write(get_log_mirror().stats())
+            st.write(get_sheet_pool().stats())
+        with st.sidebar.expander("성능 지표"):
+            st.dataframe(pd.DataFrame.from_dict(metrics.snapshot(), orient="index"))
+            st.download_button("JSON 내보내기", data=metrics.to_json(), file_name="metrics.json", mime="application/json")
+            st.download_button("Prometheus 내보내기", data=metrics.to_prometheus(), file_name="metrics.prom", mime="text/plain")
+            if st.button("지표 초기화"):
+                metrics.reset()
+        with st.sidebar.expander("비밀번호 암호화"):
+            plaintext = int((~data["비밀번호"].map(is_hashed) & (data["비밀번호"] != "")).sum())
+            st.write(f"평문으로 저장된 비밀번호: {plaintext}개")
+            if plaintext and st.button("모두 해시로 변환"):
+                progress = st.progress(0.0)
+                for idx in migrate_passwords(data, progress=lambda done, total: progress.progress(done / total)):
+                    tracker.mark(idx, "비밀번호")
+                save_data(data)
+                st.success(f"비밀번호 {plaintext}개를 해시로 변환했습니다.")
         coin_amount = st.number_input("부여 또는 회수할 코인 수:", min_value=-100, max_value=100, value=1)
         if st.button("세진코인 변경하기"):
             if coin_amount != 0:
-                data.at[student_index, "세진코인"] += coin_amount
+                change_coins({(selected_class, selected_student): coin_amount})
                 add_record(student_index, "세진코인 변경", reward=None, additional_info=f"변경된 코인: {coin_amount}")
                 save_data(data)
                 if coin_amount > 0:
@@ -175,130 +366,206 @@ if user_type == "교사용":
         st.subheader("비밀번호 변경")
         new_password = st.text_input("새로운 비밀번호 입력:", type="password")
         if st.button("비밀번호 변경"):
-            data.at[student_index, "비밀번호"] = new_password
-            save_data(data)
-            st.success(f"{selected_student}의 비밀번호가 성공적으로 변경되었습니다!")
+            if not new_password:
+                st.error("새로운 비밀번호를 입력하세요.")
+            else:
+                set_cell(student_index, "비밀번호", hash_password(new_password))
+                save_data(data)
+                st.success(f"{selected_student}의 비밀번호가 성공적으로 변경되었습니다!")
         if st.button("⚠️ 세진코인 초기화"):
-            data.at[student_index, "세진코인"] = 0
-            data.at[student_index, "기록"] = "[]"
-            add_record(student_index, "세진코인 초기화", reward=None, additional_info="세진코인 및 기록 초기화")
+            set_coins({(selected_class, selected_student): 0})
+            reset_record(student_index, "세진코인 초기화", additional_info="세진코인 및 기록 초기화")
             save_data(data)
             st.error(f"{selected_student}의 세진코인이 초기화되었습니다!")
         st.markdown("---")
         st.subheader("학급 전체 일괄 작업")
+        batch_classes = st.multiselect("대상 반:", students.classes, default=[selected_class])
+        batch_names = st.multiselect(
+            "특정 학생만 선택 (비워 두면 선택한 반 전체):",
+            [(c, s) for c in batch_classes for s in students.students(c)],
+            format_func=lambda name: f"{name[0]} {name[1]}",
+        )
+        batch_rows = select_rows(students, batch_classes, batch_names)
+        batch_target = f"선택한 학생 {len(batch_rows)}명" if batch_names else f"{', '.join(batch_classes)} 전체 학생"
         batch_coin_amount = st.number_input("전체 학급에 부여/차감할 코인 수:", min_value=-100, max_value=100, value=1, key="batch_coin")
+        with st.expander(f"미리보기 ({len(batch_rows)}명)"):
+            # 두 버튼 각각의 결과를 미리 보여줌
+            tab_change, tab_reset = st.tabs(["부여/차감", "초기화"])
+            tab_change.dataframe(preview_coin_change(data, batch_rows, delta=batch_coin_amount))
+            tab_reset.dataframe(preview_coin_change(data, batch_rows, reset=True))
         col1, col2 = st.columns(2)
         with col1:
-            if st.button("전체 일괄 부여/차감", key="batch_change"):
-                class_indices = data[data["반"] == selected_class].index
-                for idx in class_indices:
-                    data.at[idx, "세진코인"] += batch_coin_amount
-                    add_record(idx, "학급 전체 세진코인 변경", reward=None, additional_info=f"일괄 변경된 코인: {batch_coin_amount}")
+            if st.button("전체 일괄 부여/차감", key="batch_change", disabled=not batch_rows):
+                st.session_state["last_bulk"] = apply_coin_change(
+                    data, tracker, coin_store, activity_log, batch_rows, now_kst(),
+                    "학급 전체 세진코인 변경", f"일괄 변경된 코인: {batch_coin_amount}", delta=batch_coin_amount,
+                )
                 save_data(data)
                 if batch_coin_amount > 0:
-                    st.success(f"{selected_class} 전체 학생에게 세진코인 {batch_coin_amount}개 부여 완료!")
+                    st.success(f"{batch_target}에게 세진코인 {batch_coin_amount}개 부여 완료!")
                 else:
-                    st.warning(f"{selected_class} 전체 학생에게서 세진코인 {-batch_coin_amount}개 회수 완료!")
+                    st.warning(f"{batch_target}에게서 세진코인 {-batch_coin_amount}개 회수 완료!")
         with col2:
-            if st.button("전체 세진코인 초기화", key="batch_reset"):
-                class_indices = data[data["반"] == selected_class].index
-                for idx in class_indices:
-                    data.at[idx, "세진코인"] = 0
-                    data.at[idx, "기록"] = "[]"
-                    add_record(idx, "학급 전체 세진코인 초기화", reward=None, additional_info="일괄 초기화")
+            if st.button("전체 세진코인 초기화", key="batch_reset", disabled=not batch_rows):
+                st.session_state["last_bulk"] = apply_coin_change(
+                    data, tracker, coin_store, activity_log, batch_rows, now_kst(),
+                    "학급 전체 세진코인 초기화", "일괄 초기화", reset=True,
+                )
+                for idx in batch_rows:
+                    lotto_stats.forget(data.at[idx, "반"], data.at[idx, "학생"])
                 save_data(data)
-                st.error(f"{selected_class} 전체 학생의 세진코인 초기화 완료!")
+                st.error(f"{batch_target}의 세진코인 초기화 완료!")
+        last_bulk = st.session_state.get("last_bulk")
+        if last_bulk and st.button(f"마지막 일괄 작업 되돌리기 ({last_bulk['activity']}, {len(last_bulk['keys'])}명)"):
+            undo_coin_change(data, tracker, coin_store, activity_log, last_bulk, now_kst())
+            save_data(data)
+            del st.session_state["last_bulk"]
+            st.info("마지막 일괄 작업의 코인 변경을 되돌렸습니다.")
         st.markdown("---")
         st.subheader("반 단위 로또 추첨")
+        with st.expander("로또 규칙 / 확률"):
+            live_config = get_lotto_config()
+            st.write(f"번호 1~{live_config.pool} 중 {live_config.picks}개, 티켓 가격 {live_config.price:g}코인")
+            st.dataframe(pd.DataFrame(live_config.odds["tiers"]), hide_index=True)
+            st.write(
+                f"당첨 확률 {live_config.odds['win_probability']:.2%}, "
+                f"티켓 한 장의 기대 지급 코인 {live_config.odds['expected_coins']:.4f} "
+                f"(가격 대비 {live_config.odds['coin_return']:.1%})"
+            )
+            # 번호 범위와 가격을 바꿔 보며 코인 경제 조정 (등수 규칙은 그대로)
+            sim_cols = st.columns(3)
+            sim_pool = sim_cols[0].number_input("번호 범위:", min_value=live_config.picks + 1, max_value=64, value=live_config.pool)
+            sim_price = sim_cols[1].number_input("티켓 가격:", min_value=0.5, max_value=10.0, value=live_config.price, step=0.5)
+            sim_draws = sim_cols[2].number_input("시뮬레이션 횟수:", min_value=10_000, max_value=10_000_000, value=1_000_000, step=100_000)
+            if st.button("시뮬레이션 실행"):
+                sim_config = LottoConfig(sim_pool, live_config.picks, sim_price, live_config.tiers)
+                with timer("lotto_simulation"):
+                    result = simulate(sim_config, int(sim_draws))
+                st.dataframe(pd.DataFrame(result["tiers"]), hide_index=True)
+                st.write(
+                    f"평균 지급 코인 {result['mean_coins']:.4f} ± {result['std_error']:.4f} "
+                    f"(정확한 값 {sim_config.odds['expected_coins']:.4f}, 가격 대비 {result['coin_return']:.1%})"
+                )
+            st.write("회차 기록:")
+            st.dataframe(pd.DataFrame(coin_store.rounds(selected_class)), hide_index=True)
+        # 저장된 추첨 결과로 애니메이션 재생 (브라우저 연결이 끊겨도 정산은 이미 완료됨)
+        last_draw = st.session_state.get("last_draw")
+        if last_draw and last_draw["class"] == selected_class:
+            animation = animation_html(last_draw["main_balls"], last_draw["bonus_ball"], last_draw["winners"])
+            height = min(animation_height(last_draw["main_balls"], last_draw["bonus_ball"], last_draw["winners"]), 1200)
+            if hasattr(st, "iframe"):
+                st.iframe(animation, height=height)
+            else:
+                import streamlit.components.v1 as components
+                components.html(animation, height=height, scrolling=True)
+            st.button("추첨 결과 닫기", on_click=lambda: st.session_state.pop("last_draw", None))
         # 관리자 추첨 전에 구매 티켓 내역을 보여주고 확인하는 단계
         if st.button("해당 반 로또 추첨 진행"):
             st.session_state["admin_confirm_draw"] = True
         
         if st.session_state.get("admin_confirm_draw", False):
-            entries = load_lotto_entries()
             class_name = selected_class
-            if class_name not in entries or len(entries[class_name]) == 0:
+            lotto_round = coin_store.open_round(class_name, get_lotto_config().to_json(), now_kst())
+            config = config_from_json(lotto_round["config"])
+            tickets = coin_store.tickets(class_name, lotto_round["id"])
+            if len(tickets) == 0:
                 st.warning("해당 반에 구매한 로또 티켓이 없습니다.")
                 st.session_state["admin_confirm_draw"] = False
             else:
-                tickets = entries[class_name]
-                st.write("구매한 로또 티켓 내역:")
-                st.table(pd.DataFrame(tickets))
+                st.write(f"{lotto_round['id']}회차 구매한 로또 티켓 내역:")
+                st.table(pd.DataFrame(tickets).drop(columns=["id", "반"]))
                 st.write("정말 추첨하시겠습니까?")
                 col_yes, col_no = st.columns(2)
                 if col_yes.button("예, 추첨 진행"):
-                    # 로또 추첨 진행 (동일한 딜레이 및 이미지 적용)
-                    countdown_placeholder = st.empty()
-                    loading_image = "https://media3.giphy.com/media/v1.Y2lkPTc5MGI3NjExZjNmaDVzbTlrYWJrMXZzMGZkam5tOWc5OHQ5eDBhYm94OWxzN2hnZiZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9Zw/APqEbxBsVlkWSuFpth/giphy.gif"
-                    for i in range(7, 0, -1):
-                        countdown_placeholder.markdown(f"**로또 추첨까지 {i}초 남음...**")
-                        countdown_placeholder.image(loading_image, width=200)
-                        time.sleep(1)
-                    countdown_placeholder.empty()
-                    pool = list(range(1, 21))
-                    main_balls = random.sample(pool, 3)
-                    main_ball_gif = "https://media2.giphy.com/media/v1.Y2lkPTc5MGI3NjExazYzZXp0azhvdjF1M3BtM3JobjVic2Y3ZWIyaTh4ZXpkNDNwdDZtdSZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9Zw/dvgefaMHmaN2g/giphy.gif"
-                    mapping = {1: "첫번째", 2: "두번째", 3: "세번째"}
-                    for idx, ball in enumerate(main_balls, start=1):
-                        ball_placeholder = st.empty()
-                        ball_placeholder.image(main_ball_gif, width=200)
-                        time.sleep(3)
-                        ball_placeholder.markdown(
-                            f"<span style='font-size:300%; background-color:red; color:white;'>{mapping[idx]} 공: {ball}</span> :tada:",
-                            unsafe_allow_html=True
-                        )
-                    bonus_needed = any(len(set(ticket["chosen_numbers"]) & set(main_balls)) == 2 for ticket in tickets)
-                    bonus_ball = None
-                    if bonus_needed:
-                        bonus_placeholder = st.empty()
-                        for k in range(10, 0, -1):
-                            bonus_placeholder.markdown(f"**보너스 공 추첨까지 {k}초 남음...**")
-                            time.sleep(1)
-                        bonus_placeholder.empty()
-                        bonus_placeholder = st.empty()
-                        bonus_placeholder.image(main_ball_gif, width=200)
-                        time.sleep(3)
-                        bonus_ball = random.choice([n for n in pool if n not in main_balls])
-                        bonus_placeholder.markdown(
-                            f"<span style='font-size:300%; background-color:red; color:white;'>보너스 공: {bonus_ball}</span> :sparkles:",
-                            unsafe_allow_html=True
-                        )
-                    winners = []
-                    for ticket in tickets:
-                        ticket_numbers = ticket["chosen_numbers"]
-                        student_idx = ticket["student_index"]
-                        match_count = len(set(ticket_numbers) & set(main_balls))
-                        reward = None
-                        if match_count == 3:
-                            reward = "치킨"
-                        elif match_count == 2:
-                            remaining_number = list(set(ticket_numbers) - set(main_balls))[0]
-                            if bonus_ball is not None and remaining_number == bonus_ball:
-                                reward = "햄버거세트"
-                            else:
-                                reward = "매점이용권"
-                        elif match_count == 1:
-                            reward = "0.5코인"
-                            data.at[student_idx, "세진코인"] += 0.5
-                        if reward:
-                            add_record(student_idx, "로또 당첨", reward, f"당첨 번호: {main_balls}, 선택 번호: {ticket_numbers}")
-                            winners.append({
-                                "학생": ticket["학생"],
-                                "당첨 보상": reward,
-                                "선택 번호": ticket_numbers,
-                                "당첨 번호": main_balls
-                            })
-                    save_data(data)
-                    entries[class_name] = []
-                    save_lotto_entries(entries)
-                    if winners:
-                        st.success("로또 당첨 결과:")
-                        st.table(pd.DataFrame(winners))
-                    else:
-                        st.info("아쉽게도 당첨된 티켓이 없습니다.")
+                    # 결과를 먼저 계산/저장하고, 연출은 브라우저에서 재생
+                    with timer("lotto_settlement"):
+                        main_balls, bonus_ball, settlement = draw_and_settle(tickets, config, np.random.default_rng())
+                        settled = settle_draws([{
+                            "round_id": lotto_round["id"],
+                            "main_balls": main_balls,
+                            "bonus_ball": bonus_ball,
+                            "ticket_ids": [t["id"] for t in tickets],
+                            "settlement": settlement,
+                        }])
                     st.session_state["admin_confirm_draw"] = False
+                    if settled:
+                        save_data(data)
+                        lotto_stats.refresh(activity_log)
+                        st.session_state["last_draw"] = {
+                            "class": class_name,
+                            "main_balls": main_balls,
+                            "bonus_ball": bonus_ball,
+                            "winners": winner_rows(settlement),
+                        }
+                        st.rerun()
+                    st.warning("다른 화면에서 이미 추첨한 회차입니다. 결과는 회차 기록에서 확인하세요.")
                 if col_no.button("취소"):
                     st.session_state["admin_confirm_draw"] = False
+        # 티켓이 있는 모든 반을 동시에 추첨하고 잔액/기록/시트 저장은 한 번에
+        last_draw_all = st.session_state.get("last_draw_all")
+        if last_draw_all:
+            st.write(f"전체 반 추첨 결과 (시드 {last_draw_all['seed']}):")
+            st.dataframe(pd.DataFrame(last_draw_all["report"]), hide_index=True)
+            if last_draw_all["skipped"]:
+                st.warning(f"다른 화면에서 먼저 추첨해 건너뛴 반: {', '.join(last_draw_all['skipped'])}")
+            for class_name, winners in last_draw_all["winners"].items():
+                if winners:
+                    with st.expander(f"{class_name} 당첨자 {len(winners)}명"):
+                        st.table(pd.DataFrame(winners))
+            st.button("전체 추첨 결과 닫기", on_click=lambda: st.session_state.pop("last_draw_all", None))
+        if st.button("모든 반 로또 추첨"):
+            st.session_state["admin_confirm_draw_all"] = True
+        if st.session_state.get("admin_confirm_draw_all", False):
+            ticket_counts = coin_store.ticket_counts()
+            if not ticket_counts:
+                st.warning("구매한 로또 티켓이 있는 반이 없습니다.")
+                st.session_state["admin_confirm_draw_all"] = False
+            else:
+                st.write("반별 구매 티켓 수:")
+                st.table(pd.DataFrame({"티켓 수": ticket_counts}))
+                st.write(f"{len(ticket_counts)}개 반을 모두 추첨하시겠습니까?")
+                col_yes, col_no = st.columns(2)
+                if col_yes.button("예, 전체 추첨 진행"):
+                    timestamp = now_kst()
+                    live_json = get_lotto_config().to_json()
+                    lotto_rounds = {c: coin_store.open_round(c, live_json, timestamp) for c in ticket_counts}
+                    pools = {
+                        c: (coin_store.tickets(c, r["id"]), config_from_json(r["config"]))
+                        for c, r in lotto_rounds.items()
+                    }
+                    pools = {c: pool for c, pool in pools.items() if pool[0]}
+                    with timer("lotto_settlement_all"):
+                        results, seed = draw_classes(pools)
+                        draws = [
+                            {"round_id": lotto_rounds[c]["id"], "ticket_ids": [t["id"] for t in pools[c][0]], **result}
+                            for c, result in results.items()
+                        ]
+                        settled = {d["round_id"] for d in settle_draws(draws)}
+                    save_data(data)
+                    lotto_stats.refresh(activity_log)
+                    skipped = [c for c in results if lotto_rounds[c]["id"] not in settled]
+                    results = {c: r for c, r in results.items() if lotto_rounds[c]["id"] in settled}
+                    st.session_state["last_draw_all"] = {
+                        "seed": seed,
+                        "skipped": skipped,
+                        "report": [
+                            {
+                                "반": c,
+                                "회차": lotto_rounds[c]["id"],
+                                "티켓 수": len(pools[c][0]),
+                                "당첨 번호": r["main_balls"],
+                                "보너스 번호": r["bonus_ball"],
+                                "당첨자 수": len(r["settlement"]["winners"]),
+                                "지급 코인": sum(r["settlement"]["credits"].values()),
+                            }
+                            for c, r in results.items()
+                        ],
+                        "winners": {c: winner_rows(r["settlement"]) for c, r in results.items()},
+                    }
+                    st.session_state["admin_confirm_draw_all"] = False
+                    st.rerun()
+                if col_no.button("취소", key="cancel_draw_all"):
+                    st.session_state["admin_confirm_draw_all"] = False
     else:
         st.error("올바른 관리자 비밀번호를 입력하세요.")
 
@@ -307,10 +574,9 @@ if user_type == "교사용":
 # ================================
 elif user_type == "학생용":
     st.header("학생용 모드")
-    selected_class = st.selectbox("반을 선택하세요:", data["반"].unique())
-    filtered_data = data[data["반"] == selected_class]
-    selected_student = st.selectbox("학생을 선택하세요:", filtered_data["학생"].tolist())
-    student_index = data[(data["반"] == selected_class) & (data["학생"] == selected_student)].index[0]
+    selected_class = st.selectbox("반을 선택하세요:", students.classes)
+    selected_student = st.selectbox("학생을 선택하세요:", students.students(selected_class))
+    student_index = students.locate(selected_class, selected_student)
     student_coins = float(data.at[student_index, "세진코인"])
     st.markdown(
         f"<h2 style='background-color: rgba(0, 0, 0, 0.7); padding: 10px; border-radius: 8px;'>"
@@ -319,21 +585,24 @@ elif user_type == "학생용":
         unsafe_allow_html=True
     )
     password = st.text_input("비밀번호를 입력하세요:", type="password")
-    if password == str(data.at[student_index, "비밀번호"]):
+    if student_login(student_index, password):
         render_bgm()
+        config = round_config(selected_class)
         st.markdown(
             "<h2 style='background-color: rgba(0, 0, 0, 0.7); padding: 10px; border-radius: 8px;'>"
-            "🎟 로또 티켓 구매 (1코인 차감)"
+            f"🎟 로또 티켓 구매 ({config.price:g}코인 차감)"
             "</h2>",
             unsafe_allow_html=True
         )
         if "chosen_numbers" not in st.session_state:
             st.session_state["chosen_numbers"] = []
-        st.markdown("**공을 클릭하여 숫자를 선택하세요 (최대 3개):**")
-        for row in range(4):
+        st.markdown(f"**공을 클릭하여 숫자를 선택하세요 (최대 {config.picks}개):**")
+        for row in range(math.ceil(config.pool / 5)):
             cols = st.columns(5)
             for col_idx in range(5):
                 number = row * 5 + col_idx + 1
+                if number > config.pool:
+                    break
                 if number in st.session_state["chosen_numbers"]:
                     button_label = f"✅ {number}"
                 else:
@@ -342,44 +611,29 @@ elif user_type == "학생용":
                     if number in st.session_state["chosen_numbers"]:
                         st.session_state["chosen_numbers"].remove(number)
                     else:
-                        if len(st.session_state["chosen_numbers"]) < 3:
+                        if len(st.session_state["chosen_numbers"]) < config.picks:
                             st.session_state["chosen_numbers"].append(number)
         st.markdown(f"선택한 번호: {', '.join(map(str, st.session_state['chosen_numbers']))}")
-        if len(st.session_state["chosen_numbers"]) == 3:
+        if len(st.session_state["chosen_numbers"]) == config.picks:
             if st.button("로또 티켓 구매"):
-                entries = load_lotto_entries()
-                class_name = selected_class
-                duplicate_ticket = False
-                if class_name in entries:
-                    for ticket in entries[class_name]:
-                        if ticket["student_index"] == student_index and sorted(ticket["chosen_numbers"]) == sorted(st.session_state["chosen_numbers"]):
-                            duplicate_ticket = True
-                            break
-                if duplicate_ticket:
+                chosen_numbers = st.session_state["chosen_numbers"]
+                lotto_round = coin_store.open_round(selected_class, get_lotto_config().to_json(), now_kst())
+                try:
+                    new_coin_count = coin_store.purchase(
+                        selected_class, selected_student, chosen_numbers, now_kst(),
+                        price=config_from_json(lotto_round["config"]).price, round_id=lotto_round["id"],
+                    )
+                except DuplicateTicket:
                     st.error("동일한 번호로는 한 회차에 한 개만 구매 가능합니다.")
+                except InsufficientCoins:
+                    st.error("세진코인이 부족하여 티켓 구매가 불가능합니다.")
                 else:
-                    current_coins = float(data.at[student_index, "세진코인"])
-                    if current_coins < 1:
-                        st.error("세진코인이 부족하여 티켓 구매가 불가능합니다.")
-                    else:
-                        data.at[student_index, "세진코인"] = current_coins - 1
-                        save_data(data)
-                        if class_name not in entries:
-                            entries[class_name] = []
-                        ticket = {
-                            "student_index": student_index,
-                            "학생": selected_student,
-                            "chosen_numbers": st.session_state["chosen_numbers"],
-                            "timestamp": datetime.now(timezone(timedelta(hours=9))).strftime("%Y-%m-%d %H:%M:%S")
-                        }
-                        entries[class_name].append(ticket)
-                        save_lotto_entries(entries)
-                        new_coin_count = data.at[student_index, "세진코인"]
-                        add_record(student_index, "로또 티켓 구매", reward=None, additional_info=f"선택 번호: {st.session_state['chosen_numbers']}, 현재 보유 코인: {new_coin_count}개")
-                        save_data(data)
-                        st.success("티켓 구매 완료! 추첨은 관리자가 진행합니다.")
+                    set_cell(student_index, "세진코인", new_coin_count)
+                    add_record(student_index, "로또 티켓 구매", reward=None, additional_info=f"회차: {lotto_round['id']}, 선택 번호: {chosen_numbers}, 현재 보유 코인: {new_coin_count}개")
+                    save_data(data)
+                    st.success("티켓 구매 완료! 추첨은 관리자가 진행합니다.")
         else:
-            st.info("숫자 1부터 20까지의 공 중 3개를 선택해야 티켓 구매가 가능합니다.")
+            st.info(f"숫자 1부터 {config.pool}까지의 공 중 {config.picks}개를 선택해야 티켓 구매가 가능합니다.")
         student_coins = float(data.at[student_index, "세진코인"])
         st.sidebar.markdown("---")
         st.sidebar.subheader("📌 학생 정보")
@@ -392,33 +646,38 @@ elif user_type == "학생용":
 # ================================
 elif user_type == "로그 확인":
     st.header("로그 확인 모드")
-    selected_class_log = st.selectbox("반 선택:", data["반"].unique())
-    filtered_data_log = data[data["반"] == selected_class_log]
-    selected_student_log = st.selectbox("학생 선택:", filtered_data_log["학생"].tolist())
-    student_index_log = data[(data["반"] == selected_class_log) & (data["학생"] == selected_student_log)].index[0]
+    selected_class_log = st.selectbox("반 선택:", students.classes)
+    selected_student_log = st.selectbox("학생 선택:", students.students(selected_class_log))
+    student_index_log = students.locate(selected_class_log, selected_student_log)
     log_password = st.text_input("비밀번호 입력:", type="password")
     if log_password:
-        admin_password = st.secrets["general"]["admin_password"]
-        student_password = str(data.at[student_index_log, "비밀번호"])
-        if log_password == admin_password or log_password == student_password:
+        # 학생 또는 관리자 비밀번호 (둘 다 틀렸을 때만 실패로 세어 한쪽 비밀번호로 다른 쪽이 잠기지 않음)
+        if student_login(student_index_log, log_password, allow_admin=True):
             st.subheader(f"{selected_student_log}님의 활동 로그")
             st.write(f"현재 보유 코인: {data.at[student_index_log, '세진코인']}개")
-            try:
-                logs = ast.literal_eval(data.at[student_index_log, "기록"])
-            except Exception as e:
-                st.error(f"로그 데이터를 파싱하는 중 오류 발생: {e}")
+            filter_cols = st.columns(3)
+            log_activities = filter_cols[0].multiselect("활동 종류:", activity_log.activity_types(selected_class_log, selected_student_log))
+            log_start = filter_cols[1].date_input("시작 날짜:", value=None)
+            log_end = filter_cols[2].date_input("끝 날짜:", value=None)
+            log_filters = (selected_class_log, selected_student_log, log_activities, log_start, log_end)
+            total_logs = activity_log.count(*log_filters)
+            if total_logs == 0:
+                st.info("조건에 맞는 기록이 없습니다.")
             else:
-                for log in logs:
-                    timestamp = log.get("timestamp", "")
-                    activity = log.get("activity", "")
-                    reward = log.get("reward", "")
-                    additional_info = log.get("additional_info", "")
-                    log_text = f"🕒 {timestamp} - {activity}"
-                    if reward:
-                        log_text += f" (보상: {reward})"
-                    if additional_info:
-                        log_text += f" [{additional_info}]"
-                    st.write(log_text)
+                # 현재 페이지의 기록만 읽어서 표 하나로 표시
+                total_pages = (total_logs - 1) // LOG_PAGE_SIZE + 1
+                log_page = st.number_input(f"페이지 (전체 {total_pages}쪽, {total_logs}건):", min_value=1, max_value=total_pages, value=1)
+                logs = activity_log.page(*log_filters, limit=LOG_PAGE_SIZE, offset=(log_page - 1) * LOG_PAGE_SIZE)
+                st.dataframe(
+                    pd.DataFrame(logs).rename(columns={"timestamp": "🕒 시간", "activity": "활동", "reward": "보상", "info": "내용"}),
+                    hide_index=True,
+                )
+                st.download_button(
+                    "전체 기록 CSV 다운로드",
+                    data=lambda: activity_log.export_csv(*log_filters),
+                    file_name=f"{selected_class_log}_{selected_student_log}_기록.csv",
+                    mime="text/csv",
+                )
         else:
             st.error("올바른 비밀번호를 입력하세요.")
 
@@ -428,41 +687,24 @@ elif user_type == "로그 확인":
 elif user_type == "통계용":
     st.header("통계용 모드")
     st.subheader("📊 로또 당첨 통계")
-    reward_stats = {"치킨": 0, "햄버거세트": 0, "매점이용권": 0, "0.5코인": 0}
-    winners_df = data[data["기록"].apply(lambda x: isinstance(x, str) and "로또" in x)]
-    if winners_df.empty:
+    with timer("lotto_stats"):
+        lotto_stats.refresh(activity_log)
+        reward_stats = lotto_stats.summary()
+    if not any(reward_stats.values()):
         st.info("아직 로또 당첨 기록이 없습니다.")
     else:
-        for index, row in winners_df.iterrows():
-            try:
-                records = ast.literal_eval(row["기록"])
-            except Exception as e:
-                st.error(f"{row['학생']}님의 기록 파싱 중 오류 발생: {e}")
-                continue
-            for record in records:
-                reward = record.get("reward")
-                if reward in reward_stats:
-                    reward_stats[reward] += 1
         st.write("전체 당첨 횟수:")
         st.write(reward_stats)
-        winners_list = []
-        for index, row in winners_df.iterrows():
-            try:
-                records = ast.literal_eval(row["기록"])
-            except Exception:
-                continue
-            for record in records:
-                if record.get("reward") in ["치킨", "햄버거세트", "매점이용권"]:
-                    winners_list.append({
-                        "학생": row["학생"],
-                        "당첨 보상": record.get("reward", ""),
-                        "당첨 날짜": record.get("timestamp", "")
-                    })
+        winners_list = lotto_stats.winners_list()
         if winners_list:
             st.write("3등 이상 당첨자 목록:")
             st.table(pd.DataFrame(winners_list))
         else:
             st.info("3등 이상 당첨 기록이 없습니다.")
+        st.write("반별 당첨 횟수:")
+        st.dataframe(pd.DataFrame.from_dict(lotto_stats.class_breakdown(), orient="index"))
+        st.write("날짜별 당첨 횟수:")
+        st.dataframe(pd.DataFrame.from_dict(lotto_stats.date_breakdown(), orient="index"))
         st.write("로또 당첨 분석이 완료되었습니다.")
 
 st.markdown('</div>', unsafe_allow_html=True)
@@ -0,0 +1,110 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# --- 성능 측정 ---
+# 작업별 호출 수와 지연 시간 히스토그램을 프로세스 전체에서 모은다.
+# 교사용 사이드바에서 보거나 JSON / Prometheus 텍스트로 내보낼 수 있다.
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                break
+        else:
+            i = len(BUCKETS)
+        self.counts[i] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        # 버킷 상한으로 근사
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS + (self.max,), self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def observe(self, name, seconds):
+        with self.lock:
+            self.histograms.setdefault(name, Histogram()).observe(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def timed(self, name):
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: {
+                    "count": h.count,
+                    "mean_ms": round(h.total / h.count * 1000, 2) if h.count else 0.0,
+                    "p50_ms": round(h.quantile(0.5) * 1000, 2),
+                    "p95_ms": round(h.quantile(0.95) * 1000, 2),
+                    "max_ms": round(h.max * 1000, 2),
+                    "total_ms": round(h.total * 1000, 2),
+                }
+                for name, h in sorted(self.histograms.items())
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, metric="sejincoin_operation_seconds"):
+        lines = [
+            f"# HELP {metric} Latency of app operations.",
+            f"# TYPE {metric} histogram",
+        ]
+        with self.lock:
+            for name, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS, h.counts):
+                    cumulative += n
+                    lines.append(f'{metric}_bucket{{op="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{op="{name}",le="+Inf"}} {h.count}')
+                lines.append(f'{metric}_sum{{op="{name}"}} {h.total}')
+                lines.append(f'{metric}_count{{op="{name}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+
+# 프로세스 전체에서 공유하는 기본 인스턴스
+metrics = Metrics()
+timer = metrics.timer
+timed = metrics.timed
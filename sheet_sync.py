@@ -0,0 +1,401 @@
+import json
+import os
+import threading
+import time
+
+from perf import timer
+from student_index import first_rows
+
+# --- 시트 변경 추적 ---
+# data DataFrame에서 바뀐 셀만 기록해 두었다가 batch_update 한 번으로 전송한다.
+# 바뀐 셀은 (반, 학생, 컬럼)으로 기억하고 시트의 행/열은 보내기 직전의 시트에서 찾는다
+# (그 사이 시트에서 행을 끼워 넣거나 정렬해도 다른 학생의 행에 쓰지 않도록).
+# (헤더가 1행이므로 DataFrame의 n번째 행은 시트의 n+2 행)
+
+
+def col_letter(col):
+    # 1 -> A, 27 -> AA
+    letters = ""
+    while col > 0:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def a1_range(row, start_col, end_col=None):
+    start = f"{col_letter(start_col)}{row}"
+    if end_col is None or end_col == start_col:
+        return start
+    return f"{start}:{col_letter(end_col)}{row}"
+
+
+def to_cell_value(value):
+    # numpy 스칼라는 JSON으로 보낼 수 없으므로 파이썬 기본형으로 변환
+    if hasattr(value, "item"):
+        value = value.item()
+    return value
+
+
+class ChangeTracker:
+    def __init__(self):
+        self.cells = set()  # (index 라벨, 컬럼명)
+
+    def mark(self, index, column):
+        self.cells.add((index, column))
+
+    def clear(self):
+        self.cells.clear()
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __bool__(self):
+        return bool(self.cells)
+
+    def cell_values(self, data):
+        # {(반, 학생, 컬럼명): 값}
+        return {
+            (data.at[index, "반"], data.at[index, "학생"], column): to_cell_value(data.at[index, column])
+            for index, column in self.cells
+        }
+
+
+def sheet_positions(data):
+    # data와 같은 배치의 시트에서 (반, 학생) -> 시트 행, 컬럼명 -> 시트 열
+    rows = {key: data.index.get_loc(idx) + 2 for key, idx in first_rows(data).items()}
+    cols = {column: i + 1 for i, column in enumerate(data.columns)}
+    return rows, cols
+
+
+def ranges_from_cells(cells):
+    # 같은 행에서 이웃한 셀은 하나의 범위로 묶는다
+    by_row = {}
+    for (row, col), value in cells.items():
+        by_row.setdefault(row, {})[col] = value
+    ranges = []
+    for row in sorted(by_row):
+        cols = sorted(by_row[row])
+        start = cols[0]
+        values = [by_row[row][start]]
+        for prev, col in zip(cols, cols[1:]):
+            if col == prev + 1:
+                values.append(by_row[row][col])
+                continue
+            ranges.append({"range": a1_range(row, start, prev), "values": [values]})
+            start, values = col, [by_row[row][col]]
+        ranges.append({"range": a1_range(row, start, cols[-1]), "values": [values]})
+    return ranges
+
+
+
+# --- 공유 시트 클라이언트 ---
+# 인증/open_by_url은 한 번만 하고, 토큰 만료 전에 다시 연결한다.
+# 일시적인 오류(429, 5xx, 네트워크 오류)는 지수 백오프로 재시도한다.
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+AUTH_STATUS = {401, 403}
+
+
+def error_status(exc):
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) or getattr(exc, "code", None)
+
+
+class SheetPool:
+    def __init__(self, factory, max_age=50 * 60, retries=3, backoff=0.5, sleep=time.sleep, clock=time.monotonic):
+        self.factory = factory  # 워크시트를 새로 여는 함수
+        self.max_age = max_age  # 서비스 계정 토큰(1시간)보다 짧게
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.sheet = None
+        self.opened_at = 0.0
+        self.connects = 0
+        self.connect_seconds = 0.0
+        self.calls = 0
+        self.retried = 0
+
+    def worksheet(self):
+        with self.lock:
+            if self.sheet is None or self.clock() - self.opened_at > self.max_age:
+                start = time.perf_counter()
+                with timer("sheets.connect"):
+                    self.sheet = self.factory()
+                self.connect_seconds += time.perf_counter() - start
+                self.connects += 1
+                self.opened_at = self.clock()
+            return self.sheet
+
+    def invalidate(self):
+        with self.lock:
+            self.sheet = None
+
+    def call(self, method, *args, **kwargs):
+        self.calls += 1
+        for attempt in range(self.retries + 1):
+            try:
+                with timer(f"sheets.{method}"):
+                    return getattr(self.worksheet(), method)(*args, **kwargs)
+            except Exception as exc:
+                status = error_status(exc)
+                if status in AUTH_STATUS:
+                    self.invalidate()
+                elif status not in TRANSIENT_STATUS and not isinstance(exc, OSError):
+                    raise
+                if attempt == self.retries:
+                    raise
+                self.retried += 1
+                self.sleep(self.backoff * 2 ** attempt)
+
+    def stats(self):
+        return {
+            "connects": self.connects,
+            "connect_ms": round(self.connect_seconds * 1000, 1),
+            "calls": self.calls,
+            "retried": self.retried,
+        }
+
+    def __getattr__(self, name):
+        # 워크시트처럼 사용할 수 있도록 메서드 호출을 재시도 래퍼로 전달
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+
+
+# --- 쓰기 지연 큐 ---
+# 버튼 클릭은 변경된 셀을 큐에 넣고 바로 돌아가고, 백그라운드 스레드가 짧은 간격으로
+# 모아서 batch_update 한다. 같은 셀에 여러 번 쓰면 마지막 값만 보낸다.
+# 큐에 넣은 셀은 먼저 journal 파일에 기록해 두어, 보내기 전에 프로세스가 재시작돼도 다시 보낸다.
+# 보내기 직전의 수정 시각과 같은 배치의 data(frame)로 행을 찾으므로, 캐시가 오래됐거나
+# journal을 다시 보내는 경우에도 그 시점의 시트 기준으로 행을 다시 찾는다.
+class WriteBehind:
+    def __init__(
+        self, sheet, journal_path="sheet_journal.jsonl", interval=2.0, max_pending=500,
+        revision=None, on_flush=None, frame=None,
+    ):
+        self.sheet = sheet
+        self.journal_path = journal_path
+        self.interval = interval
+        self.max_pending = max_pending
+        self.revision = revision  # 시트 수정 시각을 돌려주는 함수 (보내기 직전/직후에 확인)
+        self.on_flush = on_flush  # (보낸 셀 수, 직전 수정 시각, 직후 수정 시각) -> 전송을 시도할 때마다 호출
+        self.frame = frame  # 수정 시각 -> 그 시점의 시트와 행 순서가 같은 DataFrame
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.pending = {}  # (반, 학생, 컬럼) -> 값
+        self.sending = {}  # 지금 보내는 중인 셀 (보내는 동안 시트를 다시 읽어도 덮어쓰도록 pending_cells에 포함)
+        self.layout = None  # (수정 시각, 행 위치, 열 위치) - 수정 시각이 같으면 다시 만들지 않음
+        self.enqueued = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.cells_sent = 0
+        self.failures = 0
+        self.dropped = 0  # 시트에서 학생/컬럼이 사라져 보내지 못한 셀
+        self.recovered = self._recover()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+            self.thread.start()
+        return self
+
+    def _recover(self):
+        if not os.path.exists(self.journal_path):
+            return 0
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    key, value = self._load(json.loads(line))
+                except ValueError:
+                    continue  # 마지막 줄이 쓰다 만 경우
+                self.pending[key] = value
+        return len(self.pending)
+
+    # journal 한 줄 <-> (key, 값), 실제 전송 (LogMirror가 바꿔 씀)
+    def _dump(self, key, value):
+        return [*key, value]
+
+    def _load(self, item):
+        class_name, student, column, value = item
+        return (class_name, student, column), value
+
+    def _take(self):
+        # 이번에 보낼 셀 (lock 안에서 호출, 남긴 셀은 다음 전송으로)
+        cells, self.pending = self.pending, {}
+        return cells
+
+    def _send(self, cells, revision):
+        rows, cols = self._layout(revision)
+        found = {
+            (rows[(class_name, student)], cols[column]): value
+            for (class_name, student, column), value in cells.items()
+            if (class_name, student) in rows and column in cols
+        }
+        if found:
+            self.sheet.batch_update(ranges_from_cells(found))
+        self.dropped += len(cells) - len(found)
+
+    def _layout(self, revision):
+        # revision 시점의 시트에서 행/열 위치 (수정 시각을 모르면 매번 새로 확인)
+        if self.layout is None or revision is None or self.layout[0] != revision:
+            self.layout = (revision, *sheet_positions(self.frame(revision)))
+        return self.layout[1], self.layout[2]
+
+    def enqueue(self, cells):
+        if not cells:
+            return
+        with self.lock:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                for key, value in cells.items():
+                    f.write(json.dumps(self._dump(key, value), ensure_ascii=False, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.enqueued += len(cells)
+            self.coalesced += sum(1 for cell in cells if cell in self.pending)
+            self.pending.update(cells)
+            full = len(self.pending) >= self.max_pending
+        if full:
+            self.wakeup.set()
+
+    def pending_cells(self):
+        with self.lock:
+            return {**self.sending, **self.pending}
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            cells = self.sending = self._take()
+            more = bool(self.pending)
+        if not cells:
+            return 0
+        before = after = None
+        try:
+            before = self._revision()
+            self._send(cells, before)
+        except Exception:
+            # 다음 주기에 다시 시도 (그 사이 새로 들어온 값이 우선)
+            with self.lock:
+                self.failures += 1
+                self.pending = {**cells, **self.pending}
+                self.sending = {}
+            sent = 0
+        else:
+            with self.lock:
+                self.flushes += 1
+                self.cells_sent += len(cells)
+                self.sending = {}
+                self._rewrite_journal()
+            sent = len(cells)
+            after = self._revision()
+            if self.layout is not None and before is not None and self.layout[0] == before:
+                # 셀 값만 바꾸는 쓰기는 행 배치를 바꾸지 않으므로 직후 수정 시각에도 그대로 사용
+                self.layout = (after, *self.layout[1:])
+            if more:
+                self.wakeup.set()  # 나눠 보내는 중이면 다음 묶음을 바로 전송
+        if self.on_flush is not None:
+            self.on_flush(sent, before, after)
+        return sent
+
+    def _revision(self):
+        if self.revision is None:
+            return None
+        try:
+            return self.revision()
+        except Exception:
+            return None
+
+    def _rewrite_journal(self):
+        # 아직 보내지 않은 셀만 남김
+        tmp_path = f"{self.journal_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, value in self.pending.items():
+                f.write(json.dumps(self._dump(key, value), ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "pending": len(self.pending),
+                "enqueued": self.enqueued,
+                "coalesced": self.coalesced,
+                "flushes": self.flushes,
+                "cells_sent": self.cells_sent,
+                "failures": self.failures,
+                "dropped": self.dropped,
+                "recovered": self.recovered,
+            }
+
+
+# --- 활동 기록 사본 ---
+# 활동 기록 DB는 로컬 파일이라 배포 환경에 따라 재시작하면 사라질 수 있으므로, 새 기록을 같은 스프레드시트의
+# "활동 기록" 워크시트에 한 줄씩 덧붙여 두고 DB가 없을 때 여기서 복원한다.
+# 쓰기 지연 큐와 같은 방식(journal + 백그라운드 전송)이고, 같은 기록 id는 한 번만 보낸다.
+LOG_TITLE = "활동 기록"
+LOG_HEADER = ["id", "시간", "반", "학생", "활동", "보상", "내용", "초기화"]
+
+
+def log_worksheet(spreadsheet, title=LOG_TITLE):
+    # 사본 워크시트를 찾고, 없으면 머리글과 함께 만든다
+    for worksheet in spreadsheet.worksheets():
+        if worksheet.title == title:
+            return worksheet
+    worksheet = spreadsheet.add_worksheet(title=title, rows=1000, cols=len(LOG_HEADER))
+    worksheet.append_rows([LOG_HEADER], value_input_option="RAW")
+    return worksheet
+
+
+class LogMirror(WriteBehind):
+    def __init__(self, sheet, journal_path="log_journal.jsonl", interval=5.0, max_pending=5000, batch=5000, **kwargs):
+        super().__init__(sheet, journal_path, interval, max_pending, **kwargs)
+        self.batch = batch  # 한 번에 보낼 최대 행 수 (나머지는 다음 전송에서)
+
+    def add(self, entries):
+        # entries: (id, 시간, 반, 학생, 활동, 보상, 내용, 초기화 여부) - ActivityLog의 on_append
+        self.enqueue({
+            entry[0]: [entry[0], *("" if v is None else v for v in entry[1:7]), "1" if entry[7] else ""]
+            for entry in entries
+        })
+
+    def entries(self):
+        # 시트에 남은 사본을 id 순서로 (전송을 다시 시도하며 중복된 줄은 하나만)
+        rows = {}
+        for row in self.sheet.get_all_values()[1:]:
+            row = list(row) + [""] * (len(LOG_HEADER) - len(row))
+            try:
+                log_id = int(row[0])
+            except ValueError:
+                continue
+            rows[log_id] = (log_id, *row[1:5], row[5] or None, row[6] or None, row[7] == "1")
+        return [rows[log_id] for log_id in sorted(rows)]
+
+    def _dump(self, key, value):
+        return [key, value]
+
+    def _load(self, item):
+        key, value = item
+        return key, value
+
+    def _take(self):
+        # 전송당 append_rows 한 번: 중간에 실패해도 이미 덧붙인 줄을 다시 보내지 않도록 오래된 id부터 batch개만
+        keys = sorted(self.pending)[:self.batch]
+        return {key: self.pending.pop(key) for key in keys}
+
+    def _send(self, rows, revision):
+        self.sheet.append_rows([rows[key] for key in sorted(rows)], value_input_option="RAW")
+
+
+def save_changes(data, tracker, writer, cache):
+    # 바뀐 셀만 쓰기 지연 큐에 넣고(변경 사항이 없으면 시트 요청 생략) 캐시에 최신 데이터를 알림
+    if tracker:
+        writer.enqueue(tracker.cell_values(data))
+        tracker.clear()
+    cache.note_write(data)
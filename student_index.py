@@ -0,0 +1,38 @@
+# --- 반/학생 색인 ---
+# 위젯을 누를 때마다 data 전체를 불리언 마스크로 훑지 않도록
+# 반 목록, 반별 학생 목록, (반, 학생) -> 행 번호를 데이터 버전마다 한 번만 만든다.
+
+
+def first_rows(data):
+    # (반, 학생) -> data의 행 (같은 반에 같은 이름이 있으면 첫 번째 행)
+    rows = {}
+    for idx, key in zip(data.index, zip(data["반"], data["학생"])):
+        rows.setdefault(key, idx)
+    return rows
+
+
+class StudentIndex:
+    def __init__(self, data):
+        self.classes = []
+        self.students_by_class = {}
+        self.rows = {}
+        self.rows_by_class = {}
+        for idx, class_name, student in zip(data.index, data["반"], data["학생"]):
+            if class_name not in self.students_by_class:
+                self.classes.append(class_name)
+                self.students_by_class[class_name] = []
+                self.rows_by_class[class_name] = []
+            # 같은 반에 같은 이름이 있으면 기존처럼 첫 번째 행만 사용 (잔액은 (반, 학생)마다 하나)
+            if (class_name, student) not in self.rows:
+                self.students_by_class[class_name].append(student)
+                self.rows[(class_name, student)] = idx
+                self.rows_by_class[class_name].append(idx)
+
+    def students(self, class_name):
+        return self.students_by_class.get(class_name, [])
+
+    def locate(self, class_name, student):
+        return self.rows[(class_name, student)]
+
+    def class_rows(self, class_name):
+        return self.rows_by_class.get(class_name, [])
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 저장소 루트의 모듈과 benchmarks/의 가짜 워크시트를 import
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
@@ -0,0 +1,84 @@
+import pytest
+
+from coin_store import CoinStore, DuplicateTicket, InsufficientCoins, MissingWallet
+from lotto_engine import DEFAULT_CONFIG
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CoinStore(str(tmp_path / "coin_store.db"))
+    store.set_balances({("1반", "가"): 5, ("1반", "나"): 5, ("2반", "다"): 5})
+    return store
+
+
+def buy(store, student, numbers, class_name="1반"):
+    lotto_round = store.open_round(class_name, DEFAULT_CONFIG.to_json(), "2025-01-01 10:00:00")
+    return store.purchase(class_name, student, numbers, "2025-01-01 10:00:00", round_id=lotto_round["id"]), lotto_round
+
+
+def test_purchase_charges_and_rejects_duplicates(store):
+    coins, _ = buy(store, "가", [3, 1, 2])
+    assert coins == 4
+    with pytest.raises(DuplicateTicket):
+        buy(store, "가", [1, 2, 3])
+    store.set_balances({("1반", "나"): 0})
+    with pytest.raises(InsufficientCoins):
+        buy(store, "나", [1, 2, 3])
+    assert store.balances()[("1반", "가")] == 4
+
+
+def test_settle_round_twice_pays_once(store):
+    _, lotto_round = buy(store, "가", [1, 2, 3])
+    buy(store, "나", [4, 5, 6])
+    ticket_ids = [t["id"] for t in store.tickets("1반", lotto_round["id"])]
+    draw = {
+        "round_id": lotto_round["id"],
+        "main_balls": [1, 2, 3],
+        "bonus_ball": 7,
+        "ticket_ids": ticket_ids,
+        "credits": {("1반", "가"): 0.5},
+    }
+    settled, balances = store.settle_rounds([draw], "2025-01-01 11:00:00")
+    assert settled == [lotto_round["id"]]
+    assert balances == {("1반", "가"): 4.5}
+    # 다른 화면에서 같은 회차를 한 번 더 추첨
+    assert store.settle_rounds([draw], "2025-01-01 11:00:01") == ([], {})
+    assert store.balances()[("1반", "가")] == 4.5
+    assert store.tickets("1반") == []
+    assert store.current_round("1반") is None
+
+
+def test_ticket_bought_during_draw_moves_to_next_round(store):
+    _, lotto_round = buy(store, "가", [1, 2, 3])
+    ticket_ids = [t["id"] for t in store.tickets("1반", lotto_round["id"])]
+    buy(store, "나", [1, 2, 3])  # 추첨 화면을 띄운 뒤에 산 티켓
+    store.settle_rounds([{
+        "round_id": lotto_round["id"], "main_balls": [7, 8, 9], "bonus_ball": 10,
+        "ticket_ids": ticket_ids, "credits": {},
+    }], "2025-01-01 11:00:00")
+    next_round = store.open_round("1반", DEFAULT_CONFIG.to_json(), "2025-01-01 12:00:00")
+    assert [t["학생"] for t in store.tickets("1반", next_round["id"])] == ["나"]
+
+
+def test_adjust_unknown_student_is_rejected(store):
+    with pytest.raises(MissingWallet):
+        store.adjust_balances({("1반", "가"): 1, ("1반", "없는 학생"): 1})
+    assert store.balances()[("1반", "가")] == 5  # 트랜잭션 전체를 되돌림
+
+
+def test_seed_keeps_existing_balances(store):
+    store.adjust_balances({("1반", "가"): 2})
+    store.seed_balances({("1반", "가"): 5, ("3반", "라"): 3})
+    assert store.balances()[("1반", "가")] == 7
+    assert store.balances()[("3반", "라")] == 3
+
+
+def test_changes_since_returns_only_changed_wallets(store):
+    seq, changed = store.changes_since(0)
+    assert len(changed) == 3
+    assert store.changes_since(seq) == (seq, {})
+    store.adjust_balances({("2반", "다"): -1})
+    seq, changed = store.changes_since(seq)
+    assert changed == {("2반", "다"): 4}
+    buy(store, "가", [1, 2, 3])
+    assert store.changes_since(seq)[1] == {("1반", "가"): 4}
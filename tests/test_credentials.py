@@ -0,0 +1,71 @@
+import pytest
+
+from credentials import LoginLimiter, TooManyAttempts, hash_password, verify_any, verify_password
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_limiter_counts_failures_within_window():
+    clock = Clock()
+    limiter = LoginLimiter(max_attempts=3, window=10, lockout=30, clock=clock)
+    for t in (0, 5):
+        clock.now = t
+        limiter.failure("학생")
+    clock.now = 11  # 0초의 실패는 창 밖
+    limiter.failure("학생")
+    limiter.check("학생")
+    clock.now = 12
+    limiter.failure("학생")
+    with pytest.raises(TooManyAttempts):
+        limiter.check("학생")
+    clock.now = 41
+    with pytest.raises(TooManyAttempts):
+        limiter.check("학생")
+    clock.now = 43
+    limiter.check("학생")
+    limiter.check("다른 학생")
+
+
+def test_success_clears_failures():
+    limiter = LoginLimiter(max_attempts=2, clock=Clock())
+    limiter.failure("학생")
+    limiter.success("학생")
+    limiter.failure("학생")
+    limiter.check("학생")
+
+
+def test_same_wrong_password_counts_once_per_session():
+    limiter = LoginLimiter(max_attempts=2, clock=Clock())
+    verified = {}
+    for _ in range(5):
+        assert not verify_password(verified, limiter, "학생", "틀림", "1234")
+    limiter.check("학생")
+    assert verify_password(verified, limiter, "학생", "1234", "1234")
+
+
+def test_verify_any_counts_failure_only_when_all_fail():
+    limiter = LoginLimiter(max_attempts=2, clock=Clock())
+    stored = hash_password("admin", rounds=4)
+    candidates = [("학생", "1234"), ("관리자", stored)]
+    for _ in range(3):  # 관리자 비밀번호로 여러 세션에서 학생 기록 열람
+        assert verify_any({}, limiter, candidates, "admin") == "관리자"
+    limiter.check("학생")
+    assert verify_any({}, limiter, candidates, "1234") == "학생"
+    assert verify_any({}, limiter, candidates, "wrong1") is None
+    assert verify_any({}, limiter, candidates, "wrong2") is None
+    with pytest.raises(TooManyAttempts):
+        verify_any({}, limiter, candidates, "wrong3")
+
+
+def test_locked_student_does_not_block_admin():
+    limiter = LoginLimiter(max_attempts=1, clock=Clock())
+    limiter.failure("학생")
+    assert verify_any({}, limiter, [("학생", "1234"), ("관리자", "admin")], "admin") == "관리자"
+    with pytest.raises(TooManyAttempts):
+        verify_any({}, limiter, [("학생", "1234"), ("관리자", "admin")], "1234")
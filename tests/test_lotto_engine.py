@@ -0,0 +1,39 @@
+from fractions import Fraction
+from itertools import combinations
+
+import pytest
+
+from lotto_engine import DEFAULT_CONFIG, LottoConfig, Tier, exact_odds
+
+
+def brute_force(config):
+    # 티켓을 1..picks로 고정하고 본 번호 조합과 남은 번호 중 보너스 번호를 모두 세어 등수별 확률을 구함
+    ticket = set(range(1, config.picks + 1))
+    counts = [0] * len(config.tiers)
+    total = 0
+    for main in combinations(range(1, config.pool + 1), config.picks):
+        rest = [n for n in range(1, config.pool + 1) if n not in main]
+        matches = len(ticket & set(main))
+        for bonus in rest or [None]:
+            total += 1
+            tier = config.tier_of(matches, bonus in ticket)
+            if tier >= 0:
+                counts[tier] += 1
+    return [Fraction(c, total) for c in counts]
+
+
+@pytest.mark.parametrize("config", [
+    DEFAULT_CONFIG,
+    LottoConfig(pool=12, picks=4, price=2, tiers=[
+        Tier("1등", 4, coins=10),
+        Tier("2등", 3, bonus=True, coins=4),
+        Tier("3등", 3, bonus=False, coins=2),
+        Tier("4등", 2, coins=0.5),
+    ]),
+    LottoConfig(pool=6, picks=2, tiers=[Tier("맞힘", 2, coins=3), Tier("하나", 1, coins=1)]),
+])
+def test_exact_odds_match_brute_force(config):
+    expected = brute_force(config)
+    odds = exact_odds(config)
+    assert [t["확률"] for t in odds["tiers"]] == pytest.approx([float(p) for p in expected], rel=1e-12)
+    assert odds["expected_coins"] == pytest.approx(float(sum(p * Fraction(t.coins) for p, t in zip(expected, config.tiers))))
@@ -0,0 +1,137 @@
+from data_cache import DataCache, frame_from_records
+from fake_sheet import FakeWorksheet
+from sheet_sync import ChangeTracker, LogMirror, WriteBehind, ranges_from_cells, save_changes
+
+
+def roster(n=4):
+    return [{"반": "1반", "학생": f"학생{i}", "세진코인": 5, "비밀번호": f"pw{i}"} for i in range(n)]
+
+
+def make_env(tmp_path, sheet=None):
+    # 앱과 같이 데이터 캐시 + 쓰기 지연 큐 (같은 tmp_path면 같은 journal을 이어서 사용)
+    sheet = sheet or FakeWorksheet.from_records(roster())
+    env = {}
+    cache = DataCache(
+        lambda: frame_from_records(sheet.get_all_records(), env["writer"].pending_cells()),
+        sheet.get_lastUpdateTime, str(tmp_path / "data_cache.pkl"), ttl=3600,
+    )
+    env["writer"] = WriteBehind(
+        sheet, str(tmp_path / "sheet_journal.jsonl"),
+        revision=sheet.get_lastUpdateTime, on_flush=cache.note_flushed, frame=cache.frame_at,
+    )
+    return sheet, cache, env["writer"]
+
+
+def test_ranges_from_cells_merges_neighbours_in_a_row():
+    cells = {(2, 3): "c", (2, 4): "d", (2, 1): "a", (5, 3): 1.5, (2, 6): "f"}
+    assert ranges_from_cells(cells) == [
+        {"range": "A2", "values": [["a"]]},
+        {"range": "C2:D2", "values": [["c", "d"]]},
+        {"range": "F2", "values": [["f"]]},
+        {"range": "C5", "values": [[1.5]]},
+    ]
+
+
+def test_ranges_from_cells_two_letter_columns():
+    assert ranges_from_cells({(3, 26): 1, (3, 27): 2}) == [{"range": "Z3:AA3", "values": [[1, 2]]}]
+
+
+def test_coin_change_sends_one_cell(tmp_path):
+    sheet, cache, writer = make_env(tmp_path)
+    data = cache.get()
+    tracker = ChangeTracker()
+    data.at[1, "세진코인"] = 6.0
+    tracker.mark(1, "세진코인")
+    save_changes(data, tracker, writer, cache)
+    sheet.reset_stats()
+    assert writer.flush() == 1
+    assert sheet.calls == {"get_lastUpdateTime": 2, "batch_update": 1}
+    assert sheet.bytes_sent < 100
+    assert sheet.rows[1][2] == 6.0
+    # 자기 쓰기로 바뀐 수정 시각은 채택하므로 다시 읽지 않음
+    sheet.reset_stats()
+    cache.checked_at = 0.0
+    cache.get()
+    assert "get_all_records" not in sheet.calls
+
+
+def test_no_changes_no_request(tmp_path):
+    sheet, cache, writer = make_env(tmp_path)
+    save_changes(cache.get(), ChangeTracker(), writer, cache)
+    sheet.reset_stats()
+    assert writer.flush() == 0
+    assert sheet.calls == {}
+
+
+def test_flush_finds_rows_after_external_sort(tmp_path):
+    sheet, cache, writer = make_env(tmp_path)
+    data = cache.get()
+    tracker = ChangeTracker()
+    data.at[0, "비밀번호"] = "hashed"
+    tracker.mark(0, "비밀번호")
+    save_changes(data, tracker, writer, cache)
+    sheet.rows.reverse()
+    sheet.modified += 1
+    writer.flush()
+    assert {row[1]: row[3] for row in sheet.rows} == {"학생0": "hashed", "학생1": "pw1", "학생2": "pw2", "학생3": "pw3"}
+
+
+def test_journal_recovery_after_restart(tmp_path):
+    sheet, cache, writer = make_env(tmp_path)
+    data = cache.get()
+    tracker = ChangeTracker()
+    for idx in (0, 2):
+        data.at[idx, "세진코인"] = 9.0
+        tracker.mark(idx, "세진코인")
+    save_changes(data, tracker, writer, cache)
+    with open(tmp_path / "sheet_journal.jsonl", "a", encoding="utf-8") as f:
+        f.write('["1반", "학생3", "세진')  # 쓰다가 멈춘 마지막 줄
+    # 보내기 전에 재시작: 그 사이 시트 맨 앞에 행이 추가됨
+    sheet.rows.insert(0, ["1반", "전학생", 0, ""])
+    sheet.modified += 1
+    _, cache, writer = make_env(tmp_path, sheet)
+    assert writer.recovered == 2
+    assert writer.flush() == 2
+    assert {row[1]: row[2] for row in sheet.rows} == {"전학생": 0, "학생0": 9.0, "학생1": 5, "학생2": 9.0, "학생3": 5}
+    with open(tmp_path / "sheet_journal.jsonl", encoding="utf-8") as f:
+        assert f.read() == ""
+
+
+def test_failed_flush_keeps_cells_for_retry(tmp_path):
+    sheet, cache, writer = make_env(tmp_path)
+    data = cache.get()
+    tracker = ChangeTracker()
+    data.at[0, "세진코인"] = 1.0
+    tracker.mark(0, "세진코인")
+    save_changes(data, tracker, writer, cache)
+    batch_update = sheet.batch_update
+    sheet.batch_update = lambda ranges: (_ for _ in ()).throw(OSError("quota"))
+    assert writer.flush() == 0
+    assert writer.pending_cells() == {("1반", "학생0", "세진코인"): 1.0}
+    sheet.batch_update = batch_update
+    assert writer.flush() == 1
+    assert sheet.rows[0][2] == 1.0
+
+
+def test_log_mirror_partial_failure_does_not_resend(tmp_path):
+    sheet = FakeWorksheet(["id"])
+    append_rows = sheet.append_rows
+    budget = {"calls": 2}
+
+    def flaky(values, value_input_option=None):
+        if budget["calls"] <= 0:
+            raise OSError("429")
+        budget["calls"] -= 1
+        append_rows(values, value_input_option)
+
+    sheet.append_rows = flaky
+    mirror = LogMirror(sheet, str(tmp_path / "log_journal.jsonl"), batch=10)
+    mirror.add([(i, "t", "1반", "학생", "활동", None, None, False) for i in range(1, 51)])
+    for _ in range(5):
+        mirror.flush()
+    assert len(sheet.rows) == 20
+    budget["calls"] = 100
+    for _ in range(5):
+        mirror.flush()
+    assert [int(row[0]) for row in sheet.rows] == list(range(1, 51))
+    assert mirror.entries()[0] == (1, "t", "1반", "학생", "활동", None, None, False)